@@ -15,6 +15,7 @@
 import os
 import sys
 import datetime
+import tempfile
 sys.path.insert(0, os.path.abspath('..'))
 
 import synapse
@@ -42,7 +43,7 @@ release = synapse.verstring
 # extensions coming with Sphinx (named 'sphinx.ext.*') or your custom
 # ones.
 extensions = [
-    'sphinx.ext.autodoc',
+    'autoapi.extension',
     'sphinx.ext.napoleon',
     'sphinx.ext.viewcode',
     'sphinxcontrib.jquery',
@@ -71,7 +72,7 @@ language = 'en'
 # List of patterns, relative to source directory, that match files and
 # directories to ignore when looking for source files.
 # This pattern also affects html_static_path and html_extra_path.
-exclude_patterns = ['_build', 'Thumbs.db', '.DS_Store']
+exclude_patterns = ['_build', '.jupyter_cache', 'Thumbs.db', '.DS_Store']
 
 # The name of the Pygments (syntax highlighting) style to use.
 pygments_style = None
@@ -194,18 +195,27 @@ epub_exclude_files = ['search.html']
 
 # -- Extension configuration -------------------------------------------------
 
-# Our magic
-def run_apidoc(_):
-    from sphinx.ext.apidoc import main
-
-    args = ['-M', '--no-toc', '-o', './synapse/autodocs', '../synapse', ]
-    ignores = ['../synapse/tests/test_*',
-               '../synapse/tests/files',
-               '../synapse/tests/nopmod',
-               '../synapse/vendor']
-    args.extend(ignores)
-    main(args)
+# sphinx-autoapi generates the Python API docs by parsing the source rather
+# than importing every module as autodoc does.
+autoapi_type = 'python'
+autoapi_dirs = ['../synapse']
+autoapi_root = 'synapse/autoapi'
+autoapi_add_toctree_entry = False
+autoapi_keep_files = False
+autoapi_options = [
+    'members',
+    'undoc-members',
+    'show-inheritance',
+    'show-module-summary',
+]
+autoapi_ignore = [
+    '*/tests/test_*',
+    '*/tests/files/*',
+    '*/tests/nopmod*',
+    '*/vendor/*',
+]
 
+# Our magic
 def run_modeldoc(_):
     import synapse
     import subprocess
@@ -248,58 +258,286 @@ def run_stormtypes(_):
     r = subprocess.run(args, cwd=synpd)
     assert r.returncode == 0, f'Failed to convert stormtypes.'
 
+def _getDocsJobs():
+    '''
+    Get the number of concurrent conversion jobs to run.
+
+    Set the SYN_DOCS_JOBS environment variable to override the default of one
+    job per CPU core ( SYN_DOCS_JOBS=1 runs the conversions serially ).
+    '''
+    jobs = os.getenv('SYN_DOCS_JOBS')
+    if jobs is None:
+        return os.cpu_count() or 1
+    return max(1, int(jobs))
+
+def _runDocsJobs(func, todo):
+    '''
+    Run func over each of the argument tuples in todo.
+
+    Each conversion is executed in its own subprocess, so a thread pool is
+    sufficient to drive them concurrently.
+    '''
+    import concurrent.futures
+
+    jobs = _getDocsJobs()
+    if jobs == 1 or len(todo) <= 1:
+        for args in todo:
+            func(*args)
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        futs = [pool.submit(func, *args) for args in todo]
+        for fut in concurrent.futures.as_completed(futs):
+            fut.result()
+
+docs_dir = os.path.dirname(os.path.abspath(__file__))
+docs_stamp_dir = os.path.join(docs_dir, '_build', 'stamps')
+
+_synhash = None
+
+def _getSynHash():
+    '''
+    Get a hash of the Synapse package sources, computed once per build.
+
+    Conversion output depends on the Synapse code which executes it, so any
+    change to the package ( with or without a version bump ) must invalidate
+    previously converted files.
+    '''
+    global _synhash
+
+    if _synhash is not None:
+        return _synhash
+
+    import hashlib
+
+    import synapse
+
+    hasher = hashlib.blake2b()
+    hasher.update(synapse.verstring.encode())
+
+    syndir = os.path.dirname(os.path.abspath(synapse.__file__))
+    for fdir, dirs, fns in os.walk(syndir):
+        dirs[:] = sorted(d for d in dirs if d not in ('__pycache__', 'tests'))
+        for fn in sorted(fns):
+            if fn.endswith('.pyc'):
+                continue
+            fp = os.path.join(fdir, fn)
+            hasher.update(os.path.relpath(fp, syndir).encode())
+            with open(fp, 'rb') as fd:
+                hasher.update(fd.read())
+
+    _synhash = hasher.hexdigest()
+    return _synhash
+
+def _getSrcHash(path):
+    '''
+    Get a hash of a conversion source file and the Synapse package sources.
+    '''
+    import hashlib
+
+    hasher = hashlib.blake2b()
+    hasher.update(_getSynHash().encode())
+    with open(path, 'rb') as fd:
+        hasher.update(fd.read())
+    return hasher.hexdigest()
+
+def _getStampPath(ofile):
+    '''
+    Get the path of the up-to-date stamp for a converted file.
+
+    Stamps are kept in the build directory rather than next to the sources.
+    '''
+    stamp = os.path.join(docs_stamp_dir, os.path.relpath(ofile, docs_dir) + '.stamp')
+    os.makedirs(os.path.dirname(stamp), exist_ok=True)
+    return stamp
+
+def _isUpToDate(ofile, stamp, srchash):
+    '''
+    Check if a previously converted output file was built from the current source.
+    '''
+    if not os.path.isfile(ofile) or not os.path.isfile(stamp):
+        return False
+
+    with open(stamp, 'r') as fd:
+        return fd.read().strip() == srchash
+
+def _write_if_changed(path, byts):
+    '''
+    Write bytes to a file, leaving it untouched if the contents are unchanged.
+
+    This avoids bumping the mtime which Sphinx uses to determine which
+    documents need to be rebuilt.
+    '''
+    if os.path.isfile(path):
+        with open(path, 'rb') as fd:
+            if fd.read() == byts:
+                return False
+
+    with open(path, 'wb') as fd:
+        fd.write(byts)
+    return True
+
+jupyter_cache_dir = os.path.join(docs_dir, '.jupyter_cache')
+
+def _execute_ipynb_cached(fps, dirn):
+    '''
+    Execute notebooks using jupyter-cache and save the executed notebooks into dirn.
+
+    Notebooks whose code cells are unchanged replay their cached outputs rather
+    than being re-executed. The cache is a single SQLite database, so this runs
+    once for every notebook in the main thread before the conversions are run in
+    parallel. Returns a dict of notebook paths to executed notebook paths, or None
+    if jupyter-cache is not installed.
+    '''
+    try:
+        import nbformat
+        import jupyter_cache
+        import jupyter_cache.executors as jc_executors
+    except ImportError:  # pragma: no cover
+        return None
+
+    cache = jupyter_cache.get_cache(jupyter_cache_dir)
+    pks = [cache.add_nb_to_project(fp).pk for fp in fps]
+
+    executor = jc_executors.load_executor('local-serial', cache=cache)
+    result = executor.run_and_cache(filter_pks=pks, timeout=None)
+    assert not result.errored, f'Failed to execute {result.errored}'
+
+    nbpaths = {}
+    for indx, fp in enumerate(fps):
+        _, nb = cache.merge_match_into_file(fp)
+
+        # notebooks in different directories may share a name
+        nbdir = os.path.join(dirn, str(indx))
+        os.makedirs(nbdir)
+
+        nbpath = os.path.join(nbdir, os.path.basename(fp))
+        nbformat.write(nb, nbpath)
+        nbpaths[fp] = nbpath
+
+    return nbpaths
+
+def _convert_ipynb_one(fdir, fn, srchash, nbpath):
+    import subprocess
+
+    import synapse.common as s_common
+
+    fp = os.path.join(fdir, fn)
+    ofile = os.path.join(fdir, fn.rsplit('.', 1)[0] + '.rst')
+    stamp = _getStampPath(ofile)
+
+    tick = s_common.now()
+
+    basename = fn.rsplit('.', 1)[0]
+    args = ['--template', 'vertex', '--to', 'rst', '--output-dir', fdir, '--output', basename]
+
+    if nbpath is None:
+        args.extend(('--execute', fp))
+    else:
+        args.append(nbpath)
+
+    r = subprocess.run([sys.executable, '-m', 'nbconvert'] + args)
+    assert r.returncode == 0, f'Failed to convert {fp}'
+
+    _write_if_changed(stamp, srchash.encode())
+    tock = s_common.now()
+    took = (tock - tick) / 1000
+    print(f'convert_ipynb: Notebook {fn} conversion took {took} seconds.')
+
 def convert_ipynb(_):
     import synapse.common as s_common
-    import nbconvert.nbconvertapp as nba
+
+    _getSynHash()
+
+    todo = []
     cwd = os.getcwd()
     for fdir, dirs, fns in os.walk(cwd):
         if '.ipynb_checkpoints' in dirs:
             dirs.remove('.ipynb_checkpoints')
+        if '.jupyter_cache' in dirs:
+            dirs.remove('.jupyter_cache')
         for fn in fns:
             if fn.endswith('.ipynb'):
                 # if 'httpapi' not in fn:
                 #     continue
-                tick = s_common.now()
+
                 fp = os.path.join(fdir, fn)
-                args = ['--execute', '--template', 'vertex', '--to', 'rst', fp]
-                nba.main(args)
-                tock = s_common.now()
-                took = (tock - tick) / 1000
-                print(f'convert_ipynb: Notebook {fn} execution took {took} seconds.')
+                ofile = os.path.join(fdir, fn.rsplit('.', 1)[0] + '.rst')
 
+                srchash = _getSrcHash(fp)
+                if _isUpToDate(ofile, _getStampPath(ofile), srchash):
+                    print(f'convert_ipynb: Notebook {fn} is unchanged, skipping.')
+                    continue
 
-def convert_rstorm(_):
+                todo.append((fdir, fn, srchash))
+
+    if not todo:
+        return
+
+    with tempfile.TemporaryDirectory() as dirn:
+
+        tick = s_common.now()
+        nbpaths = _execute_ipynb_cached([os.path.join(fdir, fn) for (fdir, fn, _) in todo], dirn)
+        if nbpaths is not None:
+            took = (s_common.now() - tick) / 1000
+            print(f'convert_ipynb: Executing {len(todo)} notebooks with jupyter-cache took {took} seconds.')
+        else:
+            nbpaths = {}
+
+        args = [(fdir, fn, srchash, nbpaths.get(os.path.join(fdir, fn))) for (fdir, fn, srchash) in todo]
+        _runDocsJobs(_convert_ipynb_one, args)
+
+def _convert_rstorm_one(fdir, fn, synpd, env):
     import subprocess
 
-    import synapse
     import synapse.common as s_common
+
+    oname = fn.rsplit('.', 1)[0]
+    oname = oname + '.rst'
+    sfile = os.path.join(fdir, fn)
+    ofile = os.path.join(fdir, oname)
+    tfile = ofile + '.tmp'
+    stamp = _getStampPath(ofile)
+
+    srchash = _getSrcHash(sfile)
+    if _isUpToDate(ofile, stamp, srchash):
+        print(f'convert_rstorm: Rstorm {fn} is unchanged, skipping.')
+        return
+
+    tick = s_common.now()
+
+    args = ['python', '-m', 'synapse.tools.rstorm', '--save', tfile, sfile]
+    r = subprocess.run(args, cwd=synpd, env=env)
+    assert r.returncode == 0, f'Failed to convert {sfile}'
+
+    with open(tfile, 'rb') as fd:
+        _write_if_changed(ofile, fd.read())
+    os.unlink(tfile)
+    _write_if_changed(stamp, srchash.encode())
+
+    tock = s_common.now()
+    took = (tock - tick) / 1000
+    print(f'convert_rstorm: Rstorm {fn} execution took {took} seconds.')
+
+def convert_rstorm(_):
+    import synapse
     abssynf = os.path.abspath(synapse.__file__)
     synbd = os.path.split(abssynf)[0]  # Split off __init__
     synpd = os.path.split(synbd)[0]  # split off the synapse module directory
     env = {**os.environ, 'SYN_LOG_LEVEL': 'DEBUG'}
 
+    _getSynHash()
+
+    todo = []
     cwd = os.getcwd()
     for fdir, dirs, fns in os.walk(cwd):
         for fn in fns:
             if fn.endswith('.rstorm'):
+                todo.append((fdir, fn, synpd, env))
 
-                oname = fn.rsplit('.', 1)[0]
-                oname = oname + '.rst'
-                sfile = os.path.join(fdir, fn)
-                ofile = os.path.join(fdir, oname)
-
-                tick = s_common.now()
-
-                args = ['python', '-m', 'synapse.tools.rstorm', '--save', ofile, sfile]
-                r = subprocess.run(args, cwd=synpd, env=env)
-                assert r.returncode == 0, f'Failed to convert {sfile}'
-
-                tock = s_common.now()
-                took = (tock - tick) / 1000
-                print(f'convert_rstorm: Rstorm {fn} execution took {took} seconds.')
+    _runDocsJobs(_convert_rstorm_one, todo)
 
 def setup(app):
-    app.connect('builder-inited', run_apidoc)
     app.connect('builder-inited', run_modeldoc)
     app.connect('builder-inited', run_confdocs)
     app.connect('builder-inited', convert_ipynb)
@@ -2521,8 +2521,10 @@ class Cortex(s_oauth.OAuthMixin, s_cell.Cell):  # type: ignore
         Note:
             No change control or persistence
         '''
+        cache = {}
+
         def ctor(runt, runtsafe):
-            return s_storm.PureCmd(cdef, runt, runtsafe)
+            return s_storm.PureCmd(cdef, runt, runtsafe, cache=cache)
 
         # TODO unify class ctors and func ctors vs briefs...
         def getCmdBrief():
@@ -2715,6 +2717,21 @@ class Cortex(s_oauth.OAuthMixin, s_cell.Cell):  # type: ignore
     def _getStormPkgs(self):
         return copy.deepcopy(list(self.pkghive.values()))
 
+    def getStormPkgNames(self, prefix=None):
+        '''
+        Get the names of the Storm packages loaded in the Cortex.
+
+        Args:
+            prefix (str): Only return package names which start with the prefix.
+
+        Returns:
+            list: A sorted list of package names.
+        '''
+        names = list(self.pkghive.keys())
+        if prefix is not None:
+            names = [name for name in names if name.startswith(prefix)]
+        return sorted(names)
+
     async def getStormMods(self):
         return copy.deepcopy(self.stormmods)
 
@@ -6065,16 +6082,35 @@ class Cortex(s_oauth.OAuthMixin, s_cell.Cell):  # type: ignore
         crons = []
 
         for _, cron in self.agenda.list():
+            crons.append(self._packCronJob(cron))
 
-            info = cron.pack()
+        return crons
 
-            user = self.auth.user(cron.creator)
-            if user is not None:
-                info['username'] = user.name
+    async def getCronJob(self, iden):
+        '''
+        Get information about a cron job by iden.
 
-            crons.append(info)
+        Args:
+            iden (str): The iden of the cron job.
 
-        return crons
+        Returns:
+            dict: The cron job information, or None if the cron job does not exist.
+        '''
+        cron = self.agenda.appts.get(iden)
+        if cron is None:
+            return None
+
+        return self._packCronJob(cron)
+
+    def _packCronJob(self, cron):
+
+        info = cron.pack()
+
+        user = self.auth.user(cron.creator)
+        if user is not None:
+            info['username'] = user.name
+
+        return info
 
     @s_nexus.Pusher.onPushAuto('cron:edit')
     async def editCronJob(self, iden, name, valu):
@@ -704,6 +704,10 @@ class HiveDict(s_base.Base):
         for key, node in iter(self.node):
             yield key, node.valu
 
+    def keys(self):
+        for key, _ in iter(self.node):
+            yield key
+
     def values(self):
         for _, node in iter(self.node):
             yield node.valu
@@ -82,6 +82,18 @@ class Node:
         async with self.snap.getNodeEditor(self) as editor:
             return await editor.delEdge(verb, n2iden)
 
+    async def delEdges(self, edges):
+        '''
+        Delete a list of (verb, n2iden) edges from the node using a single node editor.
+        '''
+        if self.form.isrunt:
+            mesg = f'Edges cannot be used with runt nodes: {self.form.full}'
+            raise s_exc.IsRuntForm(mesg=mesg, form=self.form.full)
+
+        async with self.snap.getNodeEditor(self) as editor:
+            for (verb, n2iden) in edges:
+                await editor.delEdge(verb, n2iden)
+
     async def iterEdgesN1(self, verb=None):
         async for edge in self.snap.iterNodeEdgesN1(self.buid, verb=verb):
             yield edge
@@ -718,7 +730,7 @@ class Path:
     '''
     A path context tracked through the storm runtime.
     '''
-    def __init__(self, vars, nodes):
+    def __init__(self, vars, nodes, shared=False):
 
         self.node = None
         self.nodes = nodes
@@ -726,7 +738,9 @@ class Path:
         if len(nodes):
             self.node = nodes[-1]
 
-        self.vars = vars
+        # a shared vars dict is owned by the runtime and is copied on first write
+        self._vars = vars
+        self._varsshared = shared
         self.frames = []
         self.ctors = {}
 
@@ -739,10 +753,22 @@ class Path:
 
         self.metadata = {}
 
+    @property
+    def vars(self):
+        if self._varsshared:
+            self._vars = dict(self._vars)
+            self._varsshared = False
+        return self._vars
+
+    @vars.setter
+    def vars(self, valu):
+        self._vars = valu
+        self._varsshared = False
+
     def getVar(self, name, defv=s_common.novalu):
 
         # check if the name is in our variables
-        valu = self.vars.get(name, s_common.novalu)
+        valu = self._vars.get(name, s_common.novalu)
         if valu is not s_common.novalu:
             return valu
 
@@ -763,6 +789,8 @@ class Path:
         self.vars[name] = valu
 
     async def popVar(self, name):
+        if self._varsshared and name not in self._vars:
+            return s_common.novalu
         return self.vars.pop(name, s_common.novalu)
 
     def meta(self, name, valu):
@@ -782,12 +810,15 @@ class Path:
         nodes = list(self.nodes)
         nodes.append(node)
 
-        path = Path(self.vars.copy(), nodes)
+        if self._varsshared:
+            return Path(self._vars, nodes, shared=True)
+
+        path = Path(self._vars.copy(), nodes)
 
         return path
 
     def clone(self):
-        path = Path(copy.copy(self.vars), copy.copy(self.nodes))
+        path = Path(copy.copy(self._vars), copy.copy(self.nodes))
         path.frames = [v.copy() for v in self.frames]
         return path
 
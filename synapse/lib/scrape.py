@@ -15,6 +15,7 @@ import synapse.data as s_data
 import synapse.common as s_common
 
 import synapse.lib.chop as s_chop
+import synapse.lib.cache as s_cache
 import synapse.lib.coro as s_coro
 import synapse.lib.link as s_link
 import synapse.lib.msgpack as s_msgpack
@@ -26,6 +27,47 @@ logger = logging.getLogger(__name__)
 
 SCRAPE_SPAWN_LENGTH = 5000
 
+def _genTriePattern(strs):
+    '''
+    Generate a regular expression pattern which matches any of the given strings.
+
+    The strings are merged into a prefix tree so that the resulting pattern
+    shares common prefixes, e.g. ( "com", "coop", "net" ) becomes
+    ``(?:co(?:m|op)|net)``. This is considerably faster to match than a flat
+    alternation. When one string is a prefix of another, the longest match wins.
+    '''
+    trie = {}
+    for text in strs:
+        node = trie
+        for char in text:
+            node = node.setdefault(char, {})
+        node[''] = None
+
+    def _genNode(node):
+        final = False
+        alts = []
+        for char, subn in sorted(node.items()):
+            if char == '':
+                final = True
+                continue
+            alts.append(regex.escape(char) + _genNode(subn))
+
+        if not alts:
+            return ''
+
+        if len(alts) == 1:
+            patt = alts[0]
+            if final:
+                patt = f'(?:{patt})?'
+            return patt
+
+        patt = '|'.join(alts)
+        if final:
+            return f'(?:{patt})?'
+        return f'(?:{patt})'
+
+    return _genNode(trie)
+
 tldlist = list(s_data.get('iana.tlds'))
 tldlist.extend([
     'bit',
@@ -36,12 +78,12 @@ tldlist.extend([
 tldlist.sort(key=lambda x: len(x))
 tldlist.reverse()
 
-tldcat = '|'.join(tldlist)
+tldcat = _genTriePattern(tldlist)
 fqdn_re = regex.compile(r'((?:[a-z0-9_-]{1,63}\.){1,10}(?:%s))' % tldcat)
 
 idna_disallowed = r'\$+<->\^`|~\u00A8\u00AF\u00B4\u00B8\u02D8-\u02DD\u037A\u0384\u0385\u1FBD\u1FBF-\u1FC1\u1FCD-\u1FCF\u1FDD-\u1FDF\u1FED-\u1FEF\u1FFD\u1FFE\u207A\u207C\u208A\u208C\u2100\u2101\u2105\u2106\u2474-\u24B5\u2A74-\u2A76\u2FF0-\u2FFB\u309B\u309C\u3200-\u321E\u3220-\u3243\u33C2\u33C7\u33D8\uFB29\uFC5E-\uFC63\uFDFA\uFDFB\uFE62\uFE64-\uFE66\uFE69\uFE70\uFE72\uFE74\uFE76\uFE78\uFE7A\uFE7C\uFE7E\uFF04\uFF0B\uFF1C-\uFF1E\uFF3E\uFF40\uFF5C\uFF5E\uFFE3\uFFFC\uFFFD\U0001F100-\U0001F10A\U0001F110-\U0001F129\U000E0100-\U000E01EF'
 
-udots = regex.compile(r'[\u3002\uff0e\uff61]')
+udots_table = str.maketrans({'\u3002': '.', '\uff0e': '.', '\uff61': '.'})
 
 # avoid thread safety issues due to uts46_remap() importing uts46data
 idna.encode('init', uts46=True)
@@ -56,9 +98,7 @@ inverse_prefixs = {
 cve_dashes = ''.join(('-',) + s_chop.unicode_dashes)
 
 def fqdn_prefix_check(match: regex.Match):
-    mnfo = match.groupdict()
-    valu = mnfo.get('valu')
-    prefix = mnfo.get('prefix')
+    valu, prefix = match.group('valu', 'prefix')
     cbfo = {}
     if prefix is not None:
         new_valu = valu.rstrip(inverse_prefixs.get(prefix))
@@ -67,12 +107,11 @@ def fqdn_prefix_check(match: regex.Match):
             cbfo['match'] = valu
     return valu, cbfo
 
-def fqdn_check(match: regex.Match):
-    mnfo = match.groupdict()
-    valu = mnfo.get('valu')
-
-    nval = unicodedata.normalize('NFKC', valu)
-    nval = regex.sub(udots, '.', nval)
+@s_cache.memoize(size=65536)
+def _isValidFqdn(valu):
+    # Domains are frequently repeated in scraped text, so cache the
+    # (expensive) idna validation by the matched value.
+    nval = unicodedata.normalize('NFKC', valu).translate(udots_table)
     nval = nval.strip().strip('.')
 
     try:
@@ -81,7 +120,13 @@ def fqdn_check(match: regex.Match):
         try:
             nval.encode('idna').decode('utf8').lower()
         except UnicodeError:
-            return None, {}
+            return False
+    return True
+
+def fqdn_check(match: regex.Match):
+    valu = match.group('valu')
+    if not _isValidFqdn(valu):
+        return None, {}
     return valu, {}
 
 def inet_server_check(match: regex.Match):
@@ -286,6 +331,36 @@ for (name, rule, opts) in scrape_types:
     blob = (regex.compile(rule, regex.IGNORECASE | opts.get('flags', 0)), opts)
     _regexes[name].append(blob)
 
+# The rules for these forms can only match text which contains at least one
+# of the given characters, which is much cheaper to check than running the
+# rules over text which cannot contain a match.
+_prefilters = {
+    'file:path': '/\\',
+    'inet:url': ':\\',
+    'inet:email': '@',
+    'inet:server': ':',
+    'inet:ipv4': '.',
+    'inet:ipv6': ':',
+    'inet:fqdn': '.\u3002\uff0e\uff61',
+    'it:sec:cve': cve_dashes,
+    'it:sec:cwe': '-',
+    'it:sec:cpe': ':',
+}
+
+# ( form, blobs, prefilter ) tuples for each form, in scrape_types order.
+_formrules = tuple((name, tuple(blobs), _prefilters.get(name)) for (name, blobs) in _regexes.items())
+_formrulesbyname = {rule[0]: (rule,) for rule in _formrules}
+
+def _getFormRules(form=None):
+    if form:
+        return _formrulesbyname.get(form, ())
+    return _formrules
+
+def _canMatch(text, chars):
+    if chars is None:
+        return True
+    return any(char in text for char in chars)
+
 def getForms():
     '''
     Get a list of forms recognized by the scrape APIs.
@@ -335,12 +410,15 @@ def genFangRegex(fangs, flags=regex.IGNORECASE):
         if len(dst) > len(src):
             raise s_exc.BadArg(mesg=f'fang dst[{dst}] must be <= in length to src[{src}]',
                                src=src, dst=dst)
-    restr = "|".join(map(regex.escape, fangs.keys()))
+    restr = _genTriePattern(fangs.keys())
     re = regex.compile(restr, flags)
     return re
 
 re_fang = genFangRegex(FANGS)
 
+def _refang_func(match: regex.Match):
+    return FANGS[match.group(0).lower()]
+
 def refang_text(txt):
     '''
     Remove address de-fanging in text blobs, .e.g. example[.]com to example.com
@@ -352,7 +430,7 @@ def refang_text(txt):
     Returns:
         (str): Re-fanged text blob
     '''
-    return re_fang.sub(lambda match: FANGS[match.group(0).lower()], txt)
+    return re_fang.sub(_refang_func, txt)
 
 def _refang2_func(match: regex.Match, offsets: dict, fangs: dict):
     # This callback exploits the fact that known de-fanging strategies either
@@ -568,9 +646,9 @@ async def genMatchesAsync(text: str, regx: regex.Regex, opts: dict):
         sock00.close()
 
 
-def _contextMatches(scrape_text, text, ruletype, refang, offsets):
+def _contextMatches(scrape_text, text, ruletype, blobs, refang, offsets):
 
-        for (regx, opts) in _regexes[ruletype]:
+        for (regx, opts) in blobs:
 
             for info in genMatches(scrape_text, regx, opts):
 
@@ -587,11 +665,12 @@ def _contextScrape(text, form=None, refang=True, first=False):
     if refang:
         scrape_text, offsets = refang_text2(text)
 
-    for ruletype, blobs in _regexes.items():
-        if form and form != ruletype:
+    for ruletype, blobs, prefilter in _getFormRules(form):
+
+        if not _canMatch(scrape_text, prefilter):
             continue
 
-        for info in _contextMatches(scrape_text, text, ruletype, refang, offsets):
+        for info in _contextMatches(scrape_text, text, ruletype, blobs, refang, offsets):
 
             yield info
 
@@ -604,14 +683,14 @@ async def _contextScrapeAsync(text, form=None, refang=True, first=False):
     if refang:
         scrape_text, offsets = refang_text2(text)
 
-    for ruletype, blobs in _regexes.items():
+    for ruletype, blobs, prefilter in _getFormRules(form):
 
         await asyncio.sleep(0)
 
-        if form and form != ruletype:
+        if not _canMatch(scrape_text, prefilter):
             continue
 
-        for info in _contextMatches(scrape_text, text, ruletype, refang, offsets):
+        for info in _contextMatches(scrape_text, text, ruletype, blobs, refang, offsets):
 
             yield info
 
@@ -1,4 +1,6 @@
+import copy
 import types
+import bisect
 import pprint
 import asyncio
 import logging
@@ -189,7 +191,7 @@ permdef_schema = {
 
 reqValidPermDef = s_config.getJsValidator(permdef_schema)
 
-reqValidPkgdef = s_config.getJsValidator({
+_pkgdef_schema = {
     'type': 'object',
     'properties': {
         'name': {'type': 'string'},
@@ -359,15 +361,14 @@ reqValidPkgdef = s_config.getJsValidator({
                             'uniqueItems': True,
                             'minItems': 1,
                         },
-                        'type': {
-                            'type': 'string',
-                            'enum': list(s_datamodel.Model().types)
-                        },
+                        'type': {'$ref': '#/definitions/cmdargtype'},
                     },
                 }
             ],
             'additionalItems': False,
         },
+        # replaced by _getCmdArgTypeSchema() when the validator is compiled
+        'cmdargtype': {'type': 'string'},
         'cmdinput': {
             'type': 'object',
             'properties': {
@@ -437,9 +438,9 @@ reqValidPkgdef = s_config.getJsValidator({
             'required': ('name',),
         },
     }
-})
+}
 
-reqValidDdef = s_config.getJsValidator({
+ddef_schema = {
     'type': 'object',
     'properties': {
         'name': {'type': 'string'},
@@ -468,7 +469,50 @@ reqValidDdef = s_config.getJsValidator({
             'additionalProperties': True,
         },
     }
-})
+}
+
+@s_cache.memoize()
+def _getTagParts(tag):
+    # tag perms are checked per node, so the same tags are split repeatedly
+    return tuple(tag.split('.'))
+
+@s_cache.memoize()
+def _getTagPruneParents(tag):
+    # parent tags of the given tag, nearest first
+    return tuple(s_chop.tags(tag)[-2::-1])
+
+@s_cache.memoize()
+def _getBaseModel():
+    # the base model types are used to validate and norm command arguments
+    return s_datamodel.Model()
+
+def _getModelTypes():
+    return tuple(_getBaseModel().types)
+
+def _getCmdArgTypeSchema():
+    return {'type': 'string', 'enum': list(_getModelTypes())}
+
+def _getPkgdefSchema():
+    schema = copy.deepcopy(_pkgdef_schema)
+    schema['definitions']['cmdargtype'] = _getCmdArgTypeSchema()
+    return schema
+
+_validschemas = {
+    'pkgdef': _getPkgdefSchema,
+    'ddef': lambda: ddef_schema,
+}
+
+@s_cache.memoize()
+def _getJsValidator(name):
+    # Compiling the larger schemas is expensive, so they are compiled on first
+    # use rather than at import time.
+    return s_config.getJsValidator(_validschemas[name]())
+
+def reqValidPkgdef(pkgdef):
+    return _getJsValidator('pkgdef')(pkgdef)
+
+def reqValidDdef(ddef):
+    return _getJsValidator('ddef')(ddef)
 
 stormcmds = (
     {
@@ -743,11 +787,9 @@ stormcmds = (
         ),
         'storm': '''
             $pdef = $lib.null
-            for $pkg in $lib.pkg.list() {
-                if $pkg.name.startswith($cmdopts.name) {
-                    $pdef = $pkg
-                    break
-                }
+            for $name in $lib.pkg.names(prefix=$cmdopts.name) {
+                $pdef = $lib.pkg.get($name)
+                break
             }
 
             if (not $pdef) {
@@ -777,13 +819,7 @@ stormcmds = (
         ),
         'storm': '''
 
-            $pkgs = $lib.set()
-
-            for $pkg in $lib.pkg.list() {
-                if $pkg.name.startswith($cmdopts.name) {
-                    $pkgs.add($pkg.name)
-                }
-            }
+            $pkgs = $lib.pkg.names(prefix=$cmdopts.name)
 
             if $($pkgs.size() = 0) {
 
@@ -791,7 +827,7 @@ stormcmds = (
 
             } elif $($pkgs.size() = 1) {
 
-                $name = $pkgs.list().index(0)
+                $name = $pkgs.index(0)
                 $lib.print('Removing package: {name}', name=$name)
                 $lib.pkg.del($name)
 
@@ -810,11 +846,9 @@ stormcmds = (
         ),
         'storm': '''
             $pdef = $lib.null
-            for $pkg in $lib.pkg.list() {
-                if $pkg.name.startswith($cmdopts.name) {
-                    $pdef = $pkg
-                    break
-                }
+            for $name in $lib.pkg.names(prefix=$cmdopts.name) {
+                $pdef = $lib.pkg.get($name)
+                break
             }
 
             if (not $pdef) {
@@ -1054,18 +1088,15 @@ stormcmds = (
 
                 $lib.print("user       iden                             view                             en?    async? cond      object                    storm query")
 
+                $rowfmt = $lib.str.concat(
+                    "{user:<10} {iden:<12} {view:<12} {enabled:<6} {async:<6} ",
+                    "{cond:<9} {obj:<14} {obj2:<10} {storm}")
+
                 for $trigger in $triggers {
-                    $user = $trigger.username.ljust(10)
-                    $iden = $trigger.iden.ljust(12)
-                    $view = $trigger.view.ljust(12)
                     ($ok, $async) = $lib.trycast(bool, $trigger.async)
-                    if $ok {
-                        $async = $lib.model.type(bool).repr($async).ljust(6)
-                    } else {
-                        $async = $lib.model.type(bool).repr($lib.false).ljust(6)
+                    if (not $ok) {
+                        $async = $lib.false
                     }
-                    $enabled = $lib.model.type(bool).repr($trigger.enabled).ljust(6)
-                    $cond = $trigger.cond.ljust(9)
 
                     $fo = ""
                     if $trigger.form {
@@ -1077,22 +1108,26 @@ stormcmds = (
                         $pr = $trigger.prop
                     }
 
-                    if $cond.startswith('tag:') {
-                        $obj = $fo.ljust(14)
-                        $obj2 = $trigger.tag.ljust(10)
+                    $obj2 = ""
+                    if $trigger.cond.startswith('tag:') {
+                        $obj = $fo
+                        $obj2 = $trigger.tag
 
                     } else {
                         if $pr {
-                            $obj = $pr.ljust(14)
+                            $obj = $pr
                         } elif $fo {
-                            $obj = $fo.ljust(14)
+                            $obj = $fo
                         } else {
-                            $obj = '<missing>     '
+                            $obj = '<missing>'
                         }
-                        $obj2 = '          '
                     }
 
-                    $lib.print(`{$user} {$iden} {$view} {$enabled} {$async} {$cond} {$obj} {$obj2} {$trigger.storm}`)
+                    $lib.print($rowfmt,
+                               user=$trigger.username, iden=$trigger.iden, view=$trigger.view,
+                               enabled=$lib.model.type(bool).repr($trigger.enabled),
+                               async=$lib.model.type(bool).repr($async),
+                               cond=$trigger.cond, obj=$obj, obj2=$obj2, storm=$trigger.storm)
                 }
             } else {
                 $lib.print("No triggers found")
@@ -1252,25 +1287,19 @@ stormcmds = (
             if $crons {
                 $lib.print("user       iden       view       en? rpt? now? err? # start last start       last end         query")
 
+                $rowfmt = $lib.str.concat(
+                    "{user:<10} {iden:<10} {view:<10} {enabled:<3} {isrecur:<4} {isrunning:<4} {iserr:<4} ",
+                    "{startcount:<7} {laststart:<16} {lastend:<16} {query}")
+
                 for $cron in $crons {
 
                     $job = $cron.pprint()
 
-                    $user = $job.user.ljust(10)
-                    $view = $job.viewshort.ljust(10)
-                    $iden = $job.idenshort.ljust(10)
-                    $enabled = $job.enabled.ljust(3)
-                    $isrecur = $job.isrecur.ljust(4)
-                    $isrunning = $job.isrunning.ljust(4)
-                    $iserr = $job.iserr.ljust(4)
-                    $startcount = $lib.str.format("{startcount}", startcount=$job.startcount).ljust(7)
-                    $laststart = $job.laststart.ljust(16)
-                    $lastend = $job.lastend.ljust(16)
-
-       $lib.print("{user} {iden} {view} {enabled} {isrecur} {isrunning} {iserr} {startcount} {laststart} {lastend} {query}",
-                               user=$user, iden=$iden, view=$view, enabled=$enabled, isrecur=$isrecur,
-                               isrunning=$isrunning, iserr=$iserr, startcount=$startcount,
-                               laststart=$laststart, lastend=$lastend, query=$job.query)
+                    $lib.print($rowfmt,
+                               user=$job.user, iden=$job.idenshort, view=$job.viewshort, enabled=$job.enabled,
+                               isrecur=$job.isrecur, isrunning=$job.isrunning, iserr=$job.iserr,
+                               startcount=$job.startcount, laststart=$job.laststart,
+                               lastend=$job.lastend, query=$job.query)
                 }
             } else {
                 $lib.print("No cron jobs found")
@@ -1538,15 +1567,26 @@ class DmonManager(s_base.Base):
 
         self.onfini(self._finiAllDmons)
 
+    def _logDmonErrs(self, verb, dmons, rets):
+        # every dmon is given a chance to finish, so failures are logged rather than raised
+        for dmon, ret in zip(dmons, rets):
+            if isinstance(ret, Exception):
+                logger.warning(f'Error during dmon {verb} ({dmon.iden}): {ret}', exc_info=ret)
+
     async def _finiAllDmons(self):
-        await asyncio.gather(*[dmon.fini() for dmon in self.dmons.values()])
+        dmons = list(self.dmons.values())
+        if not dmons:
+            return
+        rets = await asyncio.gather(*[dmon.fini() for dmon in dmons], return_exceptions=True)
+        self._logDmonErrs('fini', dmons, rets)
 
     async def _stopAllDmons(self):
-        futs = [dmon.stop() for dmon in self.dmons.values()]
-        if not futs:
+        dmons = list(self.dmons.values())
+        if not dmons:
             return
-        logger.debug(f'Stopping [{len(futs)}] Dmons')
-        await asyncio.gather(*futs)
+        logger.debug(f'Stopping [{len(dmons)}] Dmons')
+        rets = await asyncio.gather(*[dmon.stop() for dmon in dmons], return_exceptions=True)
+        self._logDmonErrs('stop', dmons, rets)
         logger.debug('Stopped Dmons')
 
     async def addDmon(self, iden, ddef):
@@ -1572,7 +1612,7 @@ class DmonManager(s_base.Base):
             return dmon.pack()
 
     def getDmonDefs(self):
-        return list(d.pack() for d in self.dmons.values())
+        return [d.pack() for d in self.dmons.values()]
 
     async def popDmon(self, iden):
         '''Remove the dmon and fini it if its exists.'''
@@ -1646,11 +1686,12 @@ class StormDmon(s_base.Base):
         await self.run()
 
     def pack(self):
-        retn = dict(self.ddef)
-        retn['count'] = self.count
-        retn['status'] = self.status
-        retn['err'] = self.err_evnt.is_set()
-        return retn
+        return {
+            **self.ddef,
+            'count': self.count,
+            'status': self.status,
+            'err': self.err_evnt.is_set(),
+        }
 
     def _runLogAdd(self, mesg):
         self.runlog.append((s_common.now(), mesg))
@@ -1712,7 +1753,8 @@ class StormDmon(s_base.Base):
                     async for nodepath in snap.storm(text, opts=opts, user=self.user):
                         # all storm tasks yield often to prevent latency
                         self.count += 1
-                        await asyncio.sleep(0)
+                        if self.count % 64 == 0:
+                            await asyncio.sleep(0)
 
                     logger.warning(f'Dmon query exited: {self.iden}', extra={'synapse': {'iden': self.iden}})
 
@@ -1751,6 +1793,8 @@ class Runtime(s_base.Base):
             opts = {}
 
         self.vars = {}
+        # set once paths share self.vars ( see initPath() )
+        self._varsshared = False
         self.ctors = {
             'lib': s_stormtypes.LibBase,
         }
@@ -1796,8 +1840,8 @@ class Runtime(s_base.Base):
             self.runtvars.update(root.runtvars)
 
         # all vars/ctors are de-facto runtsafe
-        self.runtvars.update({k: True for k in self.vars.keys()})
-        self.runtvars.update({k: True for k in self.ctors.keys()})
+        self.runtvars.update(dict.fromkeys(self.vars, True))
+        self.runtvars.update(dict.fromkeys(self.ctors, True))
 
         self.proxies = {}
 
@@ -1916,14 +1960,14 @@ class Runtime(s_base.Base):
 
     async def getTeleProxy(self, url, **opts):
 
-        flat = tuple(sorted(opts.items()))
-        prox = self.proxies.get((url, flat))
+        key = (url, frozenset(opts.items()))
+        prox = self.proxies.get(key)
         if prox is not None:
             return prox
 
         prox = await s_telepath.openurl(url, **opts)
 
-        self.proxies[(url, flat)] = prox
+        self.proxies[key] = prox
         self.snap.onfini(prox.fini)
 
         return prox
@@ -1947,7 +1991,15 @@ class Runtime(s_base.Base):
         self.task.cancel()
 
     def initPath(self, node):
-        return s_node.Path(dict(self.vars), [node])
+        self._varsshared = True
+        return s_node.Path(self.vars, [node], shared=True)
+
+    def _getOwnVars(self):
+        # copy the vars before modifying them if any paths still share them
+        if self._varsshared:
+            self.vars = dict(self.vars)
+            self._varsshared = False
+        return self.vars
 
     def getOpt(self, name, defval=None):
         return self.opts.get(name, defval)
@@ -1957,14 +2009,18 @@ class Runtime(s_base.Base):
 
     def getVar(self, name, defv=None):
 
-        item = self.vars.get(name, s_common.novalu)
-        if item is not s_common.novalu:
-            return item
+        varz = self.vars
+
+        # most lookups are for variables which are already set
+        try:
+            return varz[name]
+        except KeyError:
+            pass
 
         ctor = self.ctors.get(name)
         if ctor is not None:
             item = ctor(self)
-            self.vars[name] = item
+            self._getOwnVars()[name] = item
             return item
 
         if self.root is not None:
@@ -1975,13 +2031,14 @@ class Runtime(s_base.Base):
         return defv
 
     def _isRootScope(self, name):
-        if self.root is None:
-            return False
-        if not self.funcscope:
-            return True
-        if name in self.root.vars:
-            return True
-        return self.root._isRootScope(name)
+        runt = self
+        while runt.root is not None:
+            if not runt.funcscope:
+                return True
+            if name in runt.root.vars:
+                return True
+            runt = runt.root
+        return False
 
     async def _setVar(self, name, valu):
 
@@ -1995,7 +2052,7 @@ class Runtime(s_base.Base):
         if isinstance(valu, s_base.Base):
             valu.incref()
 
-        self.vars[name] = valu
+        self._getOwnVars()[name] = valu
 
     async def setVar(self, name, valu):
 
@@ -2014,7 +2071,10 @@ class Runtime(s_base.Base):
         if self._isRootScope(name):
             return self.root.popVar(name)
 
-        oldv = self.vars.pop(name, s_common.novalu)
+        oldv = s_common.novalu
+        if name in self.vars:
+            oldv = self._getOwnVars().pop(name)
+
         if isinstance(oldv, s_base.Base):
             await oldv.fini()
 
@@ -2053,6 +2113,25 @@ class Runtime(s_base.Base):
         iden = self.snap.wlyr.iden
         return self.user.confirm(perms, gateiden=iden)
 
+    def confirmOnce(self, seen, perms, gateiden=None):
+        '''
+        Confirm perms unless they are already in the seen set of a command which checks them per node.
+
+        Args:
+            seen (set): A set of (perms, gateiden) tuples already confirmed during this run.
+            perms (tuple): The permission path to confirm.
+            gateiden (str): The gate iden to confirm against. Defaults to the write layer.
+        '''
+        if (perms, gateiden) in seen:
+            return
+
+        if gateiden is None:
+            self.layerConfirm(perms)
+        else:
+            self.confirm(perms, gateiden=gateiden)
+
+        seen.add((perms, gateiden))
+
     def isAdmin(self, gateiden=None):
         if self.asroot:
             return True
@@ -2263,6 +2342,9 @@ class Parser:
 
         self.reqopts = []
 
+        # type name -> norm function for typed arguments
+        self.argnorms = {}
+
         self.add_argument('--help', '-h', action='store_true', default=False, help='Display the command usage.')
 
     def set_inputs(self, idefs):
@@ -2273,9 +2355,13 @@ class Parser:
         assert len(names)
 
         argtype = opts.get('type')
-        if argtype is not None and argtype not in s_datamodel.Model().types:
-            mesg = f'Argument type "{argtype}" is not a valid model type name'
-            raise s_exc.BadArg(mesg=mesg, argtype=str(argtype))
+        if argtype is not None:
+            mtyp = _getBaseModel().type(argtype)
+            if mtyp is None:
+                mesg = f'Argument type "{argtype}" is not a valid model type name'
+                raise s_exc.BadArg(mesg=mesg, argtype=str(argtype))
+
+            self.argnorms[argtype] = mtyp.norm
 
         choices = opts.get('choices')
         if choices is not None and opts.get('action') in ('store_true', 'store_false'):
@@ -2294,8 +2380,7 @@ class Parser:
 
     def _get_dest(self, names):
         names = [n.strip('-').replace('-', '_') for n in names]
-        names = list(sorted(names, key=lambda x: len(x)))
-        return names[-1]
+        return max(reversed(names), key=len)
 
     def _printf(self, *msgs):
         self.mesgs.extend(msgs)
@@ -2315,11 +2400,18 @@ class Parser:
 
     def parse_args(self, argv):
 
+        self.exc = None
+        self.exited = False
+        self.mesgs = []
+
         posargs = []
         todo = collections.deque(argv)
 
         opts = {}
 
+        optargs = self.optargs
+        get_store = self._get_store
+
         while todo:
 
             item = todo.popleft()
@@ -2329,7 +2421,7 @@ class Parser:
                 posargs.append(item)
                 continue
 
-            argdef = self.optargs.get(item)
+            argdef = optargs.get(item)
             if argdef is None:
                 posargs.append(item)
                 continue
@@ -2352,14 +2444,14 @@ class Parser:
                     vals = opts[dest] = []
 
                 fakeopts = {}
-                if not self._get_store(item, argdef, todo, fakeopts):
+                if not get_store(item, argdef, todo, fakeopts):
                     return
 
                 vals.append(fakeopts.get(dest))
                 continue
 
             assert oact == 'store'
-            if not self._get_store(item, argdef, todo, opts):
+            if not get_store(item, argdef, todo, opts):
                 return
 
         # check for help before processing other args
@@ -2395,11 +2487,7 @@ class Parser:
                 self.help(mesg)
                 return
 
-        retn = argparse.Namespace()
-
-        [setattr(retn, name, valu) for (name, valu) in opts.items()]
-
-        return retn
+        return argparse.Namespace(**opts)
 
     def _get_store(self, name, argdef, todo, opts):
 
@@ -2421,7 +2509,7 @@ class Parser:
             valu = todo.popleft()
             if argtype is not None:
                 try:
-                    valu = s_datamodel.Model().type(argtype).norm(valu)[0]
+                    valu = self.argnorms[argtype](valu)[0]
                 except Exception:
                     mesg = f'Invalid value for type ({argtype}): {valu}'
                     return self.help(mesg=mesg)
@@ -2445,7 +2533,7 @@ class Parser:
                 valu = todo.popleft()
                 if argtype is not None:
                     try:
-                        valu = s_datamodel.Model().type(argtype).norm(valu)[0]
+                        valu = self.argnorms[argtype](valu)[0]
                     except Exception:
                         mesg = f'Invalid value for type ({argtype}): {valu}'
                         return self.help(mesg=mesg)
@@ -2462,13 +2550,14 @@ class Parser:
 
         if nargs in ('*', '+'):
 
-            while todo and not self._is_opt(todo[0]):
+            isopt = self._is_opt
+            while todo and not isopt(todo[0]):
 
                 valu = todo.popleft()
 
                 if argtype is not None:
                     try:
-                        valu = s_datamodel.Model().type(argtype).norm(valu)[0]
+                        valu = self.argnorms[argtype](valu)[0]
                     except Exception:
                         mesg = f'Invalid value for type ({argtype}): {valu}'
                         return self.help(mesg=mesg)
@@ -2497,7 +2586,7 @@ class Parser:
             valu = todo.popleft()
             if argtype is not None:
                 try:
-                    valu = s_datamodel.Model().type(argtype).norm(valu)[0]
+                    valu = self.argnorms[argtype](valu)[0]
                 except Exception:
                     mesg = f'Invalid value for type ({argtype}): {valu}'
                     return self.help(mesg=mesg)
@@ -2673,8 +2762,7 @@ class Cmd:
         self.runt = runt
         self.runtsafe = runtsafe
 
-        self.pars = self.getArgParser()
-        self.pars.printf = runt.snap.printf
+        self.pars = self._getArgParser()
 
     def isReadOnly(self):
         return self.readonly
@@ -2692,6 +2780,15 @@ class Cmd:
     def getArgParser(self):
         return Parser(prog=self.getName(), descr=self.getDescr())
 
+    def _getArgParser(self):
+        # parse_args() resets the parser state on each call, so the parser
+        # built by getArgParser() is shared by every instance of the class.
+        pars = self.__class__.__dict__.get('_argparser')
+        if pars is None:
+            pars = self.getArgParser()
+            self.__class__._argparser = pars
+        return pars
+
     async def setArgv(self, argv):
 
         self.argv = argv
@@ -2701,13 +2798,16 @@ class Cmd:
         except s_exc.BadSyntax:  # pragma: no cover
             pass
 
-        for line in self.pars.mesgs:
+        # grab the results before yielding, the parser may be shared
+        mesgs, exc, exited = self.pars.mesgs, self.pars.exc, self.pars.exited
+
+        for line in mesgs:
             await self.runt.snap.printf(line)
 
-        if self.pars.exc is not None:
-            raise self.pars.exc
+        if exc is not None:
+            raise exc
 
-        return not self.pars.exited
+        return not exited
 
     async def execStormCmd(self, runt, genr):  # pragma: no cover
         ''' Abstract base method '''
@@ -2761,11 +2861,29 @@ class PureCmd(Cmd):
     # or not
     readonly = True
 
-    def __init__(self, cdef, runt, runtsafe):
+    def __init__(self, cdef, runt, runtsafe, cache=None):
         self.cdef = cdef
+        # pure commands share a class, so the parser and query for the cdef
+        # are kept in a cache dict which the caller may share between instances
+        if cache is None:
+            cache = {}
+        self.cache = cache
         Cmd.__init__(self, runt, runtsafe)
         self.asroot = cdef.get('asroot', False)
 
+    def _getArgParser(self):
+        pars = self.cache.get('pars')
+        if pars is None:
+            pars = self.cache['pars'] = self.getArgParser()
+        return pars
+
+    async def _getCmdQuery(self, runt):
+        query = self.cache.get('query')
+        if query is None:
+            text = self.cdef.get('storm')
+            query = self.cache['query'] = await runt.snap.core.getStormQuery(text)
+        return query
+
     def getDescr(self):
         return self.cdef.get('descr', 'no documentation provided')
 
@@ -2809,8 +2927,7 @@ class PureCmd(Cmd):
                 mesg = f'Command ({name}) requires permission: {permtext}'
                 raise s_exc.AuthDeny(mesg=mesg, user=runt.user.iden, username=runt.user.name)
 
-        text = self.cdef.get('storm')
-        query = await runt.snap.core.getStormQuery(text)
+        query = await self._getCmdQuery(runt)
 
         cmdopts = s_stormtypes.CmdOpts(self)
 
@@ -3125,21 +3242,22 @@ class HelpCmd(Cmd):
 
         stormpkgs = await runt.snap.core.getStormPkgs()
 
-        pkgsvcs = {}
         pkgcmds = {}
         pkgmap = {}
+        svcidens = {}
 
         for pkg in stormpkgs:
-            svciden = pkg.get('svciden')
+
+            cmds = pkg.get('commands')
+            if not cmds:
+                continue
+
             pkgname = pkg.get('name')
+            svcidens[pkgname] = pkg.get('svciden')
 
-            for cmd in pkg.get('commands', []):
+            for cmd in cmds:
                 pkgmap[cmd.get('name')] = pkgname
 
-            ssvc = runt.snap.core.getStormSvc(svciden)
-            if ssvc is not None:
-                pkgsvcs[pkgname] = f'{ssvc.name} ({svciden})'
-
         if stormcmds:
 
             if foundtype:
@@ -3166,10 +3284,13 @@ class HelpCmd(Cmd):
                 await runt.printf('')
 
             for name, cmds in sorted(pkgcmds.items()):
-                svcinfo = pkgsvcs.get(name)
 
-                if svcinfo:
-                    await runt.printf(f'service: {svcinfo}')
+                # only look up services for packages with matching commands
+                svciden = svcidens.get(name)
+                if svciden is not None:
+                    ssvc = runt.snap.core.getStormSvc(svciden)
+                    if ssvc is not None:
+                        await runt.printf(f'service: {ssvc.name} ({svciden})')
 
                 await runt.printf(f'package: {name}')
 
@@ -3464,7 +3585,7 @@ class CopyToCmd(Cmd):
                     runt.confirm(node.form.props[name].setperm, gateiden=layriden)
 
                 for tag in node.tags.keys():
-                    runt.confirm(('node', 'tag', 'add', *tag.split('.')), gateiden=layriden)
+                    runt.confirm(('node', 'tag', 'add', *_getTagParts(tag)), gateiden=layriden)
 
                 if not self.opts.no_data:
                     async for name in node.iterDataKeys():
@@ -3645,39 +3766,41 @@ class MergeCmd(Cmd):
 
         return None
 
-    async def _checkNodePerms(self, node, sode, runt):
+    async def _checkNodePerms(self, node, sode, runt, allowed):
 
         layr0 = runt.snap.view.layers[0].iden
         layr1 = runt.snap.view.layers[1].iden
 
         if sode.get('valu') is not None:
-            runt.confirm(('node', 'del', node.form.name), gateiden=layr0)
-            runt.confirm(('node', 'add', node.form.name), gateiden=layr1)
+            runt.confirmOnce(allowed, ('node', 'del', node.form.name), gateiden=layr0)
+            runt.confirmOnce(allowed, ('node', 'add', node.form.name), gateiden=layr1)
 
         for name, (valu, stortype) in sode.get('props', {}).items():
             full = node.form.prop(name).full
-            runt.confirm(('node', 'prop', 'del', full), gateiden=layr0)
-            runt.confirm(('node', 'prop', 'set', full), gateiden=layr1)
+            runt.confirmOnce(allowed, ('node', 'prop', 'del', full), gateiden=layr0)
+            runt.confirmOnce(allowed, ('node', 'prop', 'set', full), gateiden=layr1)
 
         for tag, valu in sode.get('tags', {}).items():
-            tagperm = tuple(tag.split('.'))
-            runt.confirm(('node', 'tag', 'del') + tagperm, gateiden=layr0)
-            runt.confirm(('node', 'tag', 'add') + tagperm, gateiden=layr1)
+            tagperm = _getTagParts(tag)
+            runt.confirmOnce(allowed, ('node', 'tag', 'del') + tagperm, gateiden=layr0)
+            runt.confirmOnce(allowed, ('node', 'tag', 'add') + tagperm, gateiden=layr1)
 
+        # tagprops are covered by the perms of the tag they are on
         for tag, tagdict in sode.get('tagprops', {}).items():
-            for prop, (valu, stortype) in tagdict.items():
-                tagperm = tuple(tag.split('.'))
-                runt.confirm(('node', 'tag', 'del') + tagperm, gateiden=layr0)
-                runt.confirm(('node', 'tag', 'add') + tagperm, gateiden=layr1)
+            if not tagdict:
+                continue
+            tagperm = _getTagParts(tag)
+            runt.confirmOnce(allowed, ('node', 'tag', 'del') + tagperm, gateiden=layr0)
+            runt.confirmOnce(allowed, ('node', 'tag', 'add') + tagperm, gateiden=layr1)
 
         async for name in runt.snap.view.layers[0].iterNodeDataKeys(node.buid):
-            runt.confirm(('node', 'data', 'pop', name), gateiden=layr0)
-            runt.confirm(('node', 'data', 'set', name), gateiden=layr1)
+            runt.confirmOnce(allowed, ('node', 'data', 'pop', name), gateiden=layr0)
+            runt.confirmOnce(allowed, ('node', 'data', 'set', name), gateiden=layr1)
 
         async for edge in runt.snap.view.layers[0].iterNodeEdgesN1(node.buid):
             verb = edge[0]
-            runt.confirm(('node', 'edge', 'del', verb), gateiden=layr0)
-            runt.confirm(('node', 'edge', 'add', verb), gateiden=layr1)
+            runt.confirmOnce(allowed, ('node', 'edge', 'del', verb), gateiden=layr0)
+            runt.confirmOnce(allowed, ('node', 'edge', 'add', verb), gateiden=layr1)
 
     async def execStormCmd(self, runt, genr):
 
@@ -3707,6 +3830,8 @@ class MergeCmd(Cmd):
 
             genr = diffgenr()
 
+        allowed = set()
+
         async with await runt.snap.view.parent.snap(user=runt.user.iden) as snap:
             snap.strict = False
 
@@ -3724,24 +3849,9 @@ class MergeCmd(Cmd):
 
                 subs = []
 
-                async def sync():
-
-                    if not self.opts.apply:
-                        subs.clear()
-                        return
-
-                    addedits = editor.getNodeEdits()
-                    if addedits:
-                        await runt.snap.view.parent.storNodeEdits(addedits, meta=meta)
-
-                    if subs:
-                        subedits = [(node.buid, node.form.name, subs)]
-                        await runt.snap.view.storNodeEdits(subedits, meta=meta)
-                        subs.clear()
-
                 # check all node perms first
                 if self.opts.apply:
-                    await self._checkNodePerms(node, sode, runt)
+                    await self._checkNodePerms(node, sode, runt, allowed)
 
                 form = node.form.name
                 if form == 'syn:tag':
@@ -3825,7 +3935,6 @@ class MergeCmd(Cmd):
                         if tagfilter and tagfilter(tag):
                             continue
 
-                        tagperm = tuple(tag.split('.'))
                         if not self.opts.apply:
                             valurepr = ''
                             if valu != (None, None):
@@ -3842,7 +3951,6 @@ class MergeCmd(Cmd):
                             continue
 
                         for prop, (valu, stortype) in tagdict.items():
-                            tagperm = tuple(tag.split('.'))
                             if not self.opts.apply:
                                 valurepr = repr(valu)
                                 await runt.printf(f'{nodeiden} {form}#{tag}:{prop} = {valurepr}')
@@ -3876,7 +3984,17 @@ class MergeCmd(Cmd):
                 if delnode:
                     subs.append((s_layer.EDIT_NODE_DEL, valu, ()))
 
-                await sync()
+                # each node is stored before it is yielded so downstream
+                # operators (and an early exit) see only fully merged nodes
+                if self.opts.apply:
+
+                    addedits = editor.getNodeEdits()
+                    if addedits:
+                        await runt.snap.view.parent.storNodeEdits(addedits, meta=meta)
+
+                    if subs:
+                        subedits = [(node.buid, node.form.name, subs)]
+                        await runt.snap.view.storNodeEdits(subedits, meta=meta)
 
                 runt.snap.clearCachedNode(node.buid)
                 yield await runt.snap.getNodeByBuid(node.buid), path
@@ -3948,13 +4066,13 @@ class MoveNodesCmd(Cmd):
                 self.runt.confirm(('node', 'prop', 'set', full), gateiden=self.destlayr)
 
             for tag, valu in sode.get('tags', {}).items():
-                tagperm = tuple(tag.split('.'))
+                tagperm = _getTagParts(tag)
                 self.runt.confirm(('node', 'tag', 'del') + tagperm, gateiden=layr)
                 self.runt.confirm(('node', 'tag', 'add') + tagperm, gateiden=self.destlayr)
 
             for tag, tagdict in sode.get('tagprops', {}).items():
                 for prop, (valu, stortype) in tagdict.items():
-                    tagperm = tuple(tag.split('.'))
+                    tagperm = _getTagParts(tag)
                     self.runt.confirm(('node', 'tag', 'del') + tagperm, gateiden=layr)
                     self.runt.confirm(('node', 'tag', 'add') + tagperm, gateiden=self.destlayr)
 
@@ -4270,6 +4388,19 @@ class LimitCmd(Cmd):
 
     async def execStormCmd(self, runt, genr):
 
+        if self.runtsafe:
+            # a runtsafe limit is the same for every node
+            remaining = self.opts.count
+            async for item in genr:
+
+                yield item
+                remaining -= 1
+
+                if remaining <= 0:
+                    break
+
+            return
+
         count = 0
         async for item in genr:
 
@@ -4363,10 +4494,14 @@ class MaxCmd(Cmd):
         maxvalu = None
         maxitem = None
 
-        ivaltype = self.runt.snap.core.model.type('ival')
+        ivalnorm = self.runt.snap.core.model.type('ival').norm
 
         async for item in genr:
 
+            # a runtsafe value is the same for every node so the first one wins
+            if self.runtsafe and maxitem is not None:
+                continue
+
             valu = await s_stormtypes.toprim(self.opts.valu)
             if valu is None:
                 continue
@@ -4375,7 +4510,7 @@ class MaxCmd(Cmd):
                 if valu == (None, None):
                     continue
 
-                ival, info = ivaltype.norm(valu)
+                ival, info = ivalnorm(valu)
                 valu = ival[1]
 
             valu = s_stormtypes.intify(valu)
@@ -4416,10 +4551,14 @@ class MinCmd(Cmd):
         minvalu = None
         minitem = None
 
-        ivaltype = self.runt.snap.core.model.type('ival')
+        ivalnorm = self.runt.snap.core.model.type('ival').norm
 
         async for node, path in genr:
 
+            # a runtsafe value is the same for every node so the first one wins
+            if self.runtsafe and minitem is not None:
+                continue
+
             valu = await s_stormtypes.toprim(self.opts.valu)
             if valu is None:
                 continue
@@ -4428,7 +4567,7 @@ class MinCmd(Cmd):
                 if valu == (None, None):
                     continue
 
-                ival, info = ivaltype.norm(valu)
+                ival, info = ivalnorm(valu)
                 valu = ival[0]
 
             valu = s_stormtypes.intify(valu)
@@ -4476,13 +4615,18 @@ class DelNodeCmd(Cmd):
             await runt.snap.core.getAxon()
             axon = runt.snap.core.axon
 
+        allowed = set()
+
+        count = 0
         async for node, path in genr:
 
+            count += 1
+
             # make sure we can delete the tags...
             for tag in node.tags.keys():
-                runt.layerConfirm(('node', 'tag', 'del', *tag.split('.')))
+                runt.confirmOnce(allowed, ('node', 'tag', 'del', *_getTagParts(tag)))
 
-            runt.layerConfirm(('node', 'del', node.form.name))
+            runt.confirmOnce(allowed, ('node', 'del', node.form.name))
 
             if delbytes and node.form.name == 'file:bytes':
                 sha256 = node.props.get('sha256')
@@ -4492,7 +4636,8 @@ class DelNodeCmd(Cmd):
 
             await node.delete(force=force)
 
-            await asyncio.sleep(0)
+            if count % 128 == 0:
+                await asyncio.sleep(0)
 
         # a bit odd, but we need to be detected as a generator
         if False:
@@ -4568,7 +4713,7 @@ class MoveTagCmd(Cmd):
         oldstr = oldt.ndef[1]
         oldsize = len(oldstr)
         oldparts = oldstr.split('.')
-        noldparts = len(oldparts)
+        oldprefix = oldstr + '.'
 
         newname, newinfo = await snap.getTagNorm(await s_stormtypes.tostr(self.opts.newtag))
         newparts = newname.split('.')
@@ -4606,9 +4751,8 @@ class MoveTagCmd(Cmd):
         async for node in snap.nodesByPropValu('syn:tag', '^=', oldtag):
 
             tagstr = node.ndef[1]
-            tagparts = tagstr.split('.')
             # Are we in the same tree?
-            if tagparts[:noldparts] != oldparts:
+            if tagstr != oldstr and not tagstr.startswith(oldprefix):
                 continue
 
             newtag = newstr + tagstr[oldsize:]
@@ -4641,18 +4785,16 @@ class MoveTagCmd(Cmd):
 
             count += 1
 
-            tags = list(node.tags.items())
+            # only the tags being moved need to be sorted ( children before parents )
+            tags = [(name, valu) for (name, valu) in node.tags.items() if name in retag]
             tags.sort(reverse=True)
 
             for name, valu in tags:
 
-                newt = retag.get(name)
-                if newt is None:
-                    await asyncio.sleep(0)
-                    continue
+                newt = retag[name]
 
                 # Capture tagprop information before moving tags
-                tgfo = {tagp: node.getTagProp(name, tagp) for tagp in node.getTagProps(name)}
+                tgfo = dict(node.tagprops.get(name, {}))
 
                 # Move the tags
                 await node.delTag(name)
@@ -4685,8 +4827,12 @@ class SpinCmd(Cmd):
         if False:  # make this method an async generator function
             yield None
 
+        count = 0
         async for node, path in genr:
-            await asyncio.sleep(0)
+            count += 1
+            # yield to the ioloop periodically rather than for every node
+            if count % 128 == 0:
+                await asyncio.sleep(0)
 
 class CountCmd(Cmd):
     '''
@@ -4715,10 +4861,13 @@ class CountCmd(Cmd):
     async def execStormCmd(self, runt, genr):
 
         i = 0
-        async for item in genr:
-            if self.opts.yieldnodes:
+        if self.opts.yieldnodes:
+            async for item in genr:
                 yield item
-            i += 1
+                i += 1
+        else:
+            async for item in genr:
+                i += 1
 
         await runt.printf(f'Counted {i} nodes.')
 
@@ -4978,7 +5127,11 @@ class BackgroundCmd(Cmd):
             yield item
 
         runtprims = await s_stormtypes.toprim(self.runt.getScopeVars())
-        runtvars = {k: v for (k, v) in runtprims.items() if s_msgpack.isok(v)}
+
+        # only check the vars one at a time if they can not all be packed
+        runtvars = runtprims
+        if not s_msgpack.isok(runtprims):
+            runtvars = {k: v for (k, v) in runtprims.items() if s_msgpack.isok(v)}
 
         opts = {
             'user': runt.user.iden,
@@ -5021,7 +5174,12 @@ class ParallelCmd(Cmd):
 
     async def nextitem(self, inq):
         while True:
-            item = await inq.get()
+            # only wait on the queue when it is empty
+            try:
+                item = inq.get_nowait()
+            except asyncio.QueueEmpty:
+                item = await inq.get()
+
             if item is None:
                 return
 
@@ -5054,8 +5212,10 @@ class ParallelCmd(Cmd):
 
         async with await s_base.Base.anit() as base:
 
-            inq = asyncio.Queue(maxsize=size)
-            outq = asyncio.Queue(maxsize=size)
+            # buffer more than one item per worker so the pump and workers
+            # do not hand off control for every node
+            inq = asyncio.Queue(maxsize=size * 16)
+            outq = asyncio.Queue(maxsize=size * 16)
 
             async def pump():
                 try:
@@ -5150,32 +5310,15 @@ class TeeCmd(Cmd):
                 subr = await stack.enter_async_context(runt.getSubRuntime(query))
                 runts.append(subr)
 
-            size = len(runts)
-            outq_size = size * 2
+            # every pipeline has exited before the next node is dispatched,
+            # so a single queue may be shared for the life of the command.
+            outq = asyncio.Queue(maxsize=len(runts) * 2)
+
             node = None
             async for node, path in genr:
 
                 if self.opts.parallel and runts:
-
-                    outq = asyncio.Queue(maxsize=outq_size)
-                    for subr in runts:
-                        subg = s_common.agen((node, path.fork(node)))
-                        self.runt.snap.schedCoro(self.pipeline(subr, outq, genr=subg))
-
-                    exited = 0
-
-                    while True:
-                        item = await outq.get()
-
-                        if isinstance(item, Exception):
-                            raise item
-
-                        if item is None:
-                            exited += 1
-                            if exited == size:
-                                break
-                            continue  # pragma: no cover
-
+                    async for item in self._execParallel(runts, outq, node=node, path=path):
                         yield item
 
                 else:
@@ -5190,31 +5333,38 @@ class TeeCmd(Cmd):
 
             if node is None and self.runtsafe:
                 if self.opts.parallel and runts:
+                    async for item in self._execParallel(runts, outq):
+                        yield item
 
-                    outq = asyncio.Queue(maxsize=outq_size)
+                else:
                     for subr in runts:
-                        self.runt.snap.schedCoro(self.pipeline(subr, outq))
+                        async for subitem in subr.execute():
+                            yield subitem
 
-                    exited = 0
+    async def _execParallel(self, runts, outq, node=None, path=None):
 
-                    while True:
-                        item = await outq.get()
+        for subr in runts:
+            subg = None
+            if node is not None:
+                subg = s_common.agen((node, path.fork(node)))
+            self.runt.snap.schedCoro(self.pipeline(subr, outq, genr=subg))
 
-                        if isinstance(item, Exception):
-                            raise item
+        exited = 0
+        size = len(runts)
 
-                        if item is None:
-                            exited += 1
-                            if exited == size:
-                                break
-                            continue  # pragma: no cover
+        while True:
+            item = await outq.get()
 
-                        yield item
+            if isinstance(item, Exception):
+                raise item
 
-                else:
-                    for subr in runts:
-                        async for subitem in subr.execute():
-                            yield subitem
+            if item is None:
+                exited += 1
+                if exited == size:
+                    break
+                continue  # pragma: no cover
+
+            yield item
 
     async def pipeline(self, runt, outq, genr=None):
         try:
@@ -5241,12 +5391,42 @@ class TreeCmd(Cmd):
     '''
     name = 'tree'
     readonly = True
+    maxdepth = 256
 
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
         pars.add_argument('query', help='The pivot query')
         return pars
 
+    async def walk(self, runt, text, node, path):
+
+        yield node, path
+
+        # walk depth first with a stack of pivot generators rather than
+        # nesting one generator per level, so each node is yielded directly
+        stack = [node.storm(runt, text, path=path)]
+
+        try:
+
+            while stack:
+
+                try:
+                    nnode, npath = await stack[-1].__anext__()
+                except StopAsyncIteration:
+                    stack.pop()
+                    continue
+
+                yield nnode, npath
+
+                if len(stack) >= self.maxdepth:
+                    raise s_exc.RecursionLimitHit(mesg='tree command exceeded maximum depth')
+
+                stack.append(nnode.storm(runt, text, path=npath))
+
+        finally:
+            for pivot in reversed(stack):
+                await pivot.aclose()
+
     async def execStormCmd(self, runt, genr):
 
         if not self.runtsafe:
@@ -5255,18 +5435,10 @@ class TreeCmd(Cmd):
 
         text = await s_stormtypes.tostr(self.opts.query)
 
-        async def recurse(node, path):
-
-            yield node, path
-
-            async for nnode, npath in node.storm(runt, text, path=path):
-                async for item in recurse(nnode, npath):
-                    yield item
-
         try:
 
             async for node, path in genr:
-                async for nodepath in recurse(node, path):
+                async for nodepath in self.walk(runt, text, node, path):
                     yield nodepath
 
         except s_exc.RecursionLimitHit:
@@ -5314,9 +5486,25 @@ class ScrapeCmd(Cmd):
                           help='Specific relative properties or variables to scrape')
         return pars
 
+    async def scrapeText(self, text, refang, cache):
+
+        # only short values (which tend to repeat across nodes) are cached
+        if len(text) > 1024:
+            return [(form, valu) async for (form, valu, _) in self.runt.snap.view.scrapeIface(text, refang=refang)]
+
+        key = (text, refang)
+        rows = cache.get(key)
+        if rows is None:
+            rows = [(form, valu) async for (form, valu, _) in self.runt.snap.view.scrapeIface(text, refang=refang)]
+            cache[key] = rows
+
+        return rows
+
     async def execStormCmd(self, runt, genr):
 
         node = None
+        scrapecache = s_cache.LruDict(size=1000)
+
         async for node, path in genr:  # type: s_node.Node, s_node.Path
 
             refs = await s_stormtypes.toprim(self.opts.refs)
@@ -5339,7 +5527,7 @@ class ScrapeCmd(Cmd):
 
                 text = str(text)
 
-                async for (form, valu, _) in self.runt.snap.view.scrapeIface(text, refang=refang):
+                for (form, valu) in await self.scrapeText(text, refang, scrapecache):
                     if forms and form not in forms:
                         continue
 
@@ -5451,7 +5639,9 @@ class SpliceListCmd(Cmd):
 
         async for splice in runt.snap.core.spliceHistory(runt.user):
 
-            splicetime = splice[1].get('time')
+            spliname, splinfo = splice
+
+            splicetime = splinfo.get('time')
             if splicetime is None:
                 splicetime = 0
 
@@ -5463,34 +5653,37 @@ class SpliceListCmd(Cmd):
 
             guid = s_common.guid(splice)
 
-            buid = s_common.buid(splice[1]['ndef'])
+            ndef = splinfo['ndef']
+            buid = s_common.buid(ndef)
             iden = s_common.ehex(buid)
 
             props = {'.created': s_common.now(),
                      'splice': splice,
-                     'type': splice[0],
+                     'type': spliname,
                      'iden': iden,
-                     'form': splice[1]['ndef'][0],
+                     'form': ndef[0],
                      'time': splicetime,
-                     'user': splice[1].get('user'),
-                     'prov': splice[1].get('prov'),
+                     'user': splinfo.get('user'),
+                     'prov': splinfo.get('prov'),
                      }
 
-            prop = splice[1].get('prop')
+            prop = splinfo.get('prop')
             if prop:
                 props['prop'] = prop
 
-            tag = splice[1].get('tag')
+            tag = splinfo.get('tag')
             if tag:
                 props['tag'] = tag
 
-            if 'valu' in splice[1]:
-                props['valu'] = splice[1]['valu']
-            elif splice[0] == 'node:del':
-                props['valu'] = splice[1]['ndef'][1]
+            valu = splinfo.get('valu', s_common.novalu)
+            if valu is not s_common.novalu:
+                props['valu'] = valu
+            elif spliname == 'node:del':
+                props['valu'] = ndef[1]
 
-            if 'oldv' in splice[1]:
-                props['oldv'] = splice[1]['oldv']
+            oldv = splinfo.get('oldv', s_common.novalu)
+            if oldv is not s_common.novalu:
+                props['oldv'] = oldv
 
             fullnode = (buid, {
                 'ndef': ('syn:splice', guid),
@@ -5537,6 +5730,7 @@ class SpliceUndoCmd(Cmd):
             'tag:prop:set': self.undoTagPropSet,
             'tag:prop:del': self.undoTagPropDel,
         }
+        self.permcache = set()
         Cmd.__init__(self, runt, runtsafe)
 
     def getArgParser(self):
@@ -5547,7 +5741,9 @@ class SpliceUndoCmd(Cmd):
 
     async def undoPropSet(self, runt, splice, node):
 
-        name = splice.props.get('prop')
+        props = splice.props
+
+        name = props.get('prop')
         if name == '.created':
             return
 
@@ -5557,17 +5753,19 @@ class SpliceUndoCmd(Cmd):
                 mesg = f'No property named {name}.'
                 raise s_exc.NoSuchProp(mesg=mesg, name=name, form=node.form.name)
 
-            oldv = splice.props.get('oldv')
+            oldv = props.get('oldv')
             if oldv is not None:
-                runt.layerConfirm(('node', 'prop', 'set', prop.full))
+                runt.confirmOnce(self.permcache, ('node', 'prop', 'set', prop.full))
                 await node.set(name, oldv)
             else:
-                runt.layerConfirm(('node', 'prop', 'del', prop.full))
+                runt.confirmOnce(self.permcache, ('node', 'prop', 'del', prop.full))
                 await node.pop(name)
 
     async def undoPropDel(self, runt, splice, node):
 
-        name = splice.props.get('prop')
+        props = splice.props
+
+        name = props.get('prop')
         if name == '.created':
             return
 
@@ -5577,81 +5775,91 @@ class SpliceUndoCmd(Cmd):
                 mesg = f'No property named {name}.'
                 raise s_exc.NoSuchProp(mesg=mesg, name=name, form=node.form.name)
 
-            valu = splice.props.get('valu')
+            valu = props.get('valu')
 
-            runt.layerConfirm(('node', 'prop', 'set', prop.full))
+            runt.confirmOnce(self.permcache, ('node', 'prop', 'set', prop.full))
             await node.set(name, valu)
 
     async def undoNodeAdd(self, runt, splice, node):
 
         if node:
             for tag in node.tags.keys():
-                runt.layerConfirm(('node', 'tag', 'del', *tag.split('.')))
+                runt.confirmOnce(self.permcache, ('node', 'tag', 'del', *_getTagParts(tag)))
 
-            runt.layerConfirm(('node', 'del', node.form.name))
+            runt.confirmOnce(self.permcache, ('node', 'del', node.form.name))
             await node.delete(force=self.opts.force)
 
     async def undoNodeDel(self, runt, splice, node):
 
+        props = splice.props
+
         if node is None:
-            form = splice.props.get('form')
-            valu = splice.props.get('valu')
+            form = props.get('form')
+            valu = props.get('valu')
 
             if form and (valu is not None):
-                runt.layerConfirm(('node', 'add', form))
+                runt.confirmOnce(self.permcache, ('node', 'add', form))
                 await runt.snap.addNode(form, valu)
 
     async def undoTagAdd(self, runt, splice, node):
 
+        props = splice.props
+
         if node:
-            tag = splice.props.get('tag')
-            parts = tag.split('.')
-            runt.layerConfirm(('node', 'tag', 'del', *parts))
+            tag = props.get('tag')
+            parts = _getTagParts(tag)
+            runt.confirmOnce(self.permcache, ('node', 'tag', 'del', *parts))
 
             await node.delTag(tag)
 
-            oldv = splice.props.get('oldv')
+            oldv = props.get('oldv')
             if oldv is not None:
-                runt.layerConfirm(('node', 'tag', 'add', *parts))
+                runt.confirmOnce(self.permcache, ('node', 'tag', 'add', *parts))
                 await node.addTag(tag, valu=oldv)
 
     async def undoTagDel(self, runt, splice, node):
 
+        props = splice.props
+
         if node:
-            tag = splice.props.get('tag')
-            parts = tag.split('.')
-            runt.layerConfirm(('node', 'tag', 'add', *parts))
+            tag = props.get('tag')
+            parts = _getTagParts(tag)
+            runt.confirmOnce(self.permcache, ('node', 'tag', 'add', *parts))
 
-            valu = splice.props.get('valu')
+            valu = props.get('valu')
             if valu is not None:
                 await node.addTag(tag, valu=valu)
 
     async def undoTagPropSet(self, runt, splice, node):
 
+        props = splice.props
+
         if node:
-            tag = splice.props.get('tag')
-            parts = tag.split('.')
+            tag = props.get('tag')
+            parts = _getTagParts(tag)
 
-            prop = splice.props.get('prop')
+            prop = props.get('prop')
 
-            oldv = splice.props.get('oldv')
+            oldv = props.get('oldv')
             if oldv is not None:
-                runt.layerConfirm(('node', 'tag', 'add', *parts))
+                runt.confirmOnce(self.permcache, ('node', 'tag', 'add', *parts))
                 await node.setTagProp(tag, prop, oldv)
             else:
-                runt.layerConfirm(('node', 'tag', 'del', *parts))
+                runt.confirmOnce(self.permcache, ('node', 'tag', 'del', *parts))
                 await node.delTagProp(tag, prop)
 
     async def undoTagPropDel(self, runt, splice, node):
 
+        props = splice.props
+
         if node:
-            tag = splice.props.get('tag')
-            parts = tag.split('.')
-            runt.layerConfirm(('node', 'tag', 'add', *parts))
+            tag = props.get('tag')
+            parts = _getTagParts(tag)
+            runt.confirmOnce(self.permcache, ('node', 'tag', 'add', *parts))
 
-            prop = splice.props.get('prop')
+            prop = props.get('prop')
 
-            valu = splice.props.get('valu')
+            valu = props.get('valu')
             if valu is not None:
                 await node.setTagProp(tag, prop, valu)
 
@@ -5731,18 +5939,20 @@ class LiftByVerb(Cmd):
     async def iterEdgeNodes(self, verb, idenset, n2=False):
         if n2:
             async for (_, _, n2) in self.runt.snap.view.getEdges(verb):
-                if n2 in idenset:
+                buid = s_common.uhex(n2)
+                if buid in idenset:
                     continue
-                await idenset.add(n2)
-                node = await self.runt.snap.getNodeByBuid(s_common.uhex(n2))
+                await idenset.add(buid)
+                node = await self.runt.snap.getNodeByBuid(buid)
                 if node:
                     yield node
         else:
             async for (n1, _, _) in self.runt.snap.view.getEdges(verb):
-                if n1 in idenset:
+                buid = s_common.uhex(n1)
+                if buid in idenset:
                     continue
-                await idenset.add(n1)
-                node = await self.runt.snap.getNodeByBuid(s_common.uhex(n1))
+                await idenset.add(buid)
+                node = await self.runt.snap.getNodeByBuid(buid)
                 if node:
                     yield node
 
@@ -5797,15 +6007,41 @@ class EdgesDelCmd(Cmd):
                           help='Delete light edges where input node is N2 instead of N1.')
         return pars
 
+    async def delEdgesN2(self, n2iden, edges):
+
+        byn1 = collections.defaultdict(list)
+        for (verb, n1iden) in edges:
+            byn1[n1iden].append((verb, n2iden))
+
+        for n1iden, n1edges in byn1.items():
+            n1 = await self.runt.snap.getNodeByBuid(s_common.uhex(n1iden))
+            await n1.delEdges(n1edges)
+
     async def delEdges(self, node, verb, n2=False):
+
+        # deletes are applied in batches to amortize the node edit overhead
+        edges = []
+
         if n2:
             n2iden = node.iden()
-            async for (v, n1iden) in node.iterEdgesN2(verb):
-                n1 = await self.runt.snap.getNodeByBuid(s_common.uhex(n1iden))
-                await n1.delEdge(v, n2iden)
+            async for edge in node.iterEdgesN2(verb):
+                edges.append(edge)
+                if len(edges) >= 1000:
+                    await self.delEdgesN2(n2iden, edges)
+                    edges.clear()
+
+            if edges:
+                await self.delEdgesN2(n2iden, edges)
+
         else:
-            async for (v, n2iden) in node.iterEdgesN1(verb):
-                await node.delEdge(v, n2iden)
+            async for edge in node.iterEdgesN1(verb):
+                edges.append(edge)
+                if len(edges) >= 1000:
+                    await node.delEdges(edges)
+                    edges.clear()
+
+            if edges:
+                await node.delEdges(edges)
 
     async def execStormCmd(self, runt, genr):
 
@@ -5940,12 +6176,42 @@ class TagPruneCmd(Cmd):
         pars.add_argument('tags', default=[], nargs='*', help='Names of tags to prune.')
         return pars
 
-    def hasChildTags(self, node, tag):
+    def hasChildTags(self, tags, tag):
+        '''
+        Check a sorted list of tags for any children of the given tag.
+        '''
         pref = tag + '.'
-        for ntag in node.tags:
-            if ntag.startswith(pref):
-                return True
-        return False
+        indx = bisect.bisect_right(tags, pref)
+        return indx < len(tags) and tags[indx].startswith(pref)
+
+    def delSortedTag(self, tags, tag):
+        '''
+        Remove a tag and its children from a sorted list of tags.
+        '''
+        indx = bisect.bisect_left(tags, tag)
+        if indx < len(tags) and tags[indx] == tag:
+            del tags[indx]
+
+        # children share the tag. prefix so they are contiguous
+        pref = tag + '.'
+        indx = bisect.bisect_left(tags, pref)
+        stop = bisect.bisect_left(tags, tag + '/')
+        del tags[indx:stop]
+
+    async def pruneTags(self, node, tags):
+
+        sortags = sorted(node.tags)
+
+        for tag, parents in tags.items():
+            await node.delTag(tag)
+            self.delSortedTag(sortags, tag)
+
+            for parent in parents:
+                if not self.hasChildTags(sortags, parent):
+                    await node.delTag(parent)
+                    self.delSortedTag(sortags, parent)
+                else:
+                    break
 
     async def execStormCmd(self, runt, genr):
 
@@ -5954,20 +6220,12 @@ class TagPruneCmd(Cmd):
 
             tags = {}
             for tag in tagargs:
-                root = tag.split('.')[0]
+                root = _getTagParts(tag)[0]
                 runt.layerConfirm(('node', 'tag', 'del', root))
-                tags[tag] = s_chop.tags(tag)[-2::-1]
+                tags[tag] = _getTagPruneParents(tag)
 
             async for node, path in genr:
-                for tag, parents in tags.items():
-                    await node.delTag(tag)
-
-                    for parent in parents:
-                        if not self.hasChildTags(node, parent):
-                            await node.delTag(parent)
-                        else:
-                            break
-
+                await self.pruneTags(node, tags)
                 yield node, path
 
         else:
@@ -5978,22 +6236,12 @@ class TagPruneCmd(Cmd):
 
                 tags = {}
                 for tag in tagargs:
-                    root = tag.split('.')[0]
-                    if root not in permcache:
-                        runt.layerConfirm(('node', 'tag', 'del', root))
-                        permcache.add(root)
-
-                    tags[tag] = s_chop.tags(tag)[-2::-1]
+                    root = _getTagParts(tag)[0]
+                    runt.confirmOnce(permcache, ('node', 'tag', 'del', root))
 
-                for tag, parents in tags.items():
-                    await node.delTag(tag)
-
-                    for parent in parents:
-                        if not self.hasChildTags(node, parent):
-                            await node.delTag(parent)
-                        else:
-                            break
+                    tags[tag] = _getTagPruneParents(tag)
 
+                await self.pruneTags(node, tags)
                 yield node, path
 
 class RunAsCmd(Cmd):
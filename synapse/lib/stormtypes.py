@@ -388,15 +388,41 @@ def intify(x):
         mesg = f'Failed to make an integer from "{x}".'
         raise s_exc.BadCast(mesg=mesg) from e
 
+_fmtre = regex.compile(r'\{(\w+)(?::([^{}]*))?\}')
+
 async def kwarg_format(_text, **kwargs):
     '''
     Replaces instances curly-braced argument names in text with their values
+
+    Notes:
+        An argument name may be followed by a format spec ( such as {name:<10} )
+        which is applied to the string representation of the value. Names which
+        were not passed are left as-is and substituted values are never re-scanned.
     '''
+    if not kwargs or '{' not in _text:
+        return _text
+
+    reprs = {}
     for name, valu in kwargs.items():
-        temp = '{%s}' % (name,)
-        _text = _text.replace(temp, await torepr(valu, usestr=True))
+        reprs[name] = await torepr(valu, usestr=True)
+
+    def repl(match):
+        name, spec = match.group(1, 2)
+        text = reprs.get(name)
+        if text is None:
+            return match.group(0)
+        if spec is None:
+            return text
+        return _fmtWithSpec(text, spec)
 
-    return _text
+    return _fmtre.sub(repl, _text)
+
+def _fmtWithSpec(text, spec):
+    try:
+        return format(text, spec)
+    except ValueError as e:
+        mesg = f'Invalid format spec {spec!r}: {e}'
+        raise s_exc.BadArg(mesg=mesg, spec=spec) from None
 
 class StormType:
     '''
@@ -598,6 +624,24 @@ class LibPkg(Lib):
         {'name': 'list', 'desc': 'Get a list of Storm Packages loaded in the Cortex.',
          'type': {'type': 'function', '_funcname': '_libPkgList',
                   'returns': {'type': 'list', 'desc': 'A list of Storm Package definitions.', }}},
+        {'name': 'names', 'desc': '''
+        Get a list of the names of the Storm Packages loaded in the Cortex.
+
+        Notes:
+            Unlike ``$lib.pkg.list()``, this does not copy each package definition,
+            which makes it the cheaper choice when only the names are needed.
+
+        Examples:
+            Print the names of the packages which start with "acme"::
+
+                for $name in $lib.pkg.names(prefix=acme) { $lib.print($name) }
+        ''',
+         'type': {'type': 'function', '_funcname': '_libPkgNames',
+                  'args': (
+                      {'name': 'prefix', 'type': 'str', 'default': None,
+                       'desc': 'Only return package names which start with the prefix.', },
+                  ),
+                  'returns': {'type': 'list', 'desc': 'A sorted list of Storm Package names.', }}},
         {'name': 'deps', 'desc': 'Verify the dependencies for a Storm Package.',
          'type': {'type': 'function', '_funcname': '_libPkgDeps',
                   'args': (
@@ -614,6 +658,7 @@ class LibPkg(Lib):
             'has': self._libPkgHas,
             'del': self._libPkgDel,
             'list': self._libPkgList,
+            'names': self._libPkgNames,
             'deps': self._libPkgDeps,
         }
 
@@ -646,6 +691,11 @@ class LibPkg(Lib):
         pkgs = await self.runt.snap.core.getStormPkgs()
         return list(sorted(pkgs, key=lambda x: x.get('name')))
 
+    @stormfunc(readonly=True)
+    async def _libPkgNames(self, prefix=None):
+        prefix = await tostr(prefix, noneok=True)
+        return self.runt.snap.core.getStormPkgNames(prefix=prefix)
+
     async def _libPkgDeps(self, pkgdef):
         pkgdef = await toprim(pkgdef)
         return await self.runt.snap.core.verifyStormPkgDeps(pkgdef)
@@ -1216,6 +1266,9 @@ class LibBase(Lib):
             Notes:
                 Arbitrary objects can be printed as well. They will have their Python __repr()__ printed.
 
+                Keyword arguments are substituted using the same rules as ``$lib.str.format()``,
+                including optional format specs such as ``{name:<10}``.
+
             ''',
          'type': {'type': 'function', '_funcname': '_print',
                   'args': (
@@ -1734,7 +1787,19 @@ class LibStr(Lib):
                          $str=$lib.str.format('Hello {name}, your list is {list}!', name='Reader', list=$list)
                          $lib.print($str)
 
-                    Hello Reader, your list is ['1', '2', '3', '4']!''',
+                    Hello Reader, your list is ['1', '2', '3', '4']!
+
+                Pad values into columns using format specs::
+
+                    cli> storm $lib.print($lib.str.format('{name:<8}|{count:>4}', name=visi, count=(10)))
+
+                    visi    |  10
+
+            Notes:
+                An argument name may be followed by a Python format spec, such as ``{name:<10}``,
+                which is applied to the string representation of the value. An invalid format spec
+                for a given argument raises a ``BadArg`` error. Names which are not passed as
+                arguments are left in the text unchanged.''',
          'type': {'type': 'function', '_funcname': 'format',
                   'args': (
                       {'name': 'text', 'type': 'str', 'desc': 'The base text string.', },
@@ -3941,7 +4006,10 @@ class Str(Prim):
 
                 $template='Hello {name}, list is {list}!' $list=(1,2,3,4) $new=$template.format(name='Reader', list=$list)
 
-                ''',
+        Notes:
+            Format specs are supported in the same way as ``$lib.str.format()``, such as ``{name:<10}``.
+            An invalid format spec for a given argument raises a ``BadArg`` error.
+            ''',
          'type': {'type': 'function', '_funcname': '_methStrFormat',
                   'args': (
                       {'name': '**kwargs', 'type': 'any',
@@ -9011,6 +9079,13 @@ class LibCron(Lib):
         Returns the cron that starts with prefix.  Prints out error and returns None if it doesn't match
         exactly one.
         '''
+        # a full iden can only match itself, so skip listing every cron job
+        if s_common.isguid(prefix):
+            todo = s_common.todo('getCronJob', prefix)
+            cron = await self.dyncall('cortex', todo)
+            if cron is not None and allowed(perm, gateiden=prefix):
+                return cron
+
         todo = s_common.todo('listCronJobs')
         crons = await self.dyncall('cortex', todo)
         matchcron = None
@@ -3194,6 +3194,10 @@ class CortexBasicTest(s_t_utils.SynTest):
             self.eq(2, await core.count('inet:user | limit 10 | [ +#foo.bar ]'))
             self.eq(1, await core.count('inet:user | limit 10 | +inet:user=visi'))
 
+            # a per-node limit is checked against each node's value
+            self.eq(1, await core.count('inet:user | limit $($lib.len($node.value()) - 3)'))
+            self.eq(2, await core.count('inet:user | limit $lib.len($node.value())'))
+
             # test invalid option syntax
             msgs = await alist(core.storm('inet:user | limit --woot'))
             self.printed(msgs, 'Usage: limit [options] <count>')
@@ -6611,6 +6615,25 @@ class CortexBasicTest(s_t_utils.SynTest):
             msgs = await core.stormlist('cron.list')
             self.stormIsInPrint('$lib.print(woot)', msgs)
 
+    async def test_cortex_cron_get(self):
+
+        async with self.getTestCore() as core:
+
+            iden = await core.callStorm('return($lib.cron.add(query="[test:str=foo]", daily="13:37").iden)')
+
+            cron = await core.getCronJob(iden)
+            self.eq(iden, cron.get('iden'))
+            self.eq('root', cron.get('username'))
+            self.none(await core.getCronJob(s_common.guid()))
+
+            opts = {'vars': {'iden': iden, 'prefix': iden[:8], 'newp': s_common.guid()}}
+            self.eq(iden, await core.callStorm('return($lib.cron.get($iden).iden)', opts=opts))
+            self.eq(iden, await core.callStorm('return($lib.cron.get($prefix).iden)', opts=opts))
+            await self.asyncraises(s_exc.StormRuntimeError, core.callStorm('$lib.cron.del($newp)', opts=opts))
+
+            await core.callStorm('$lib.cron.del($iden)', opts=opts)
+            self.none(await core.getCronJob(iden))
+
     async def test_cortex_migrationmode(self):
         async with self.getTestCore() as core:
             async with core.getLocalProxy(user='root') as prox:
@@ -58,6 +58,7 @@ class HiveTest(s_test.SynTest):
                     await hivedict.set('lulz', 'boo')
                     items = list(hivedict.items())
                     self.eq([('hehe', 400), ('haha', 'hoho'), ('lulz', 'boo')], items)
+                    self.eq(['hehe', 'haha', 'lulz'], list(hivedict.keys()))
                     self.eq('boo', await hivedict.pop('lulz'))
                     self.eq(31337, await hivedict.pop('lulz'))
 
@@ -387,6 +387,26 @@ class NodeTest(s_t_utils.SynTest):
                     self.len(0, path.frames)
                     self.eq(s_common.novalu, path.getVar('bar'))
 
+                    # Paths from initPath() share the runtime vars until written
+                    await runt.setVar('hehe', 'haha')
+                    path = runt.initPath(node)
+                    fork = path.fork(node)
+                    self.eq(path.getVar('hehe'), 'haha')
+                    self.eq(s_common.novalu, await path.popVar('newp'))
+                    await path.setVar('hehe', 'lolz')
+                    await fork.popVar('hehe')
+                    self.eq(path.getVar('hehe'), 'lolz')
+                    self.eq(fork.getVar('hehe'), s_common.novalu)
+                    self.eq(runt.getVar('hehe'), 'haha')
+                    path.vars['foo'] = 'bar'
+                    self.none(runt.getVar('foo'))
+
+                    # runtime writes do not leak into existing paths
+                    path = runt.initPath(node)
+                    await runt.setVar('hehe', 'rofl')
+                    self.eq(path.getVar('hehe'), 'haha')
+                    self.eq(runt.getVar('hehe'), 'rofl')
+
         # Ensure that path clone() behavior in storm is as expected
         # with a real-world style test..
         async with self.getTestCore() as core:
@@ -493,6 +513,18 @@ class NodeTest(s_t_utils.SynTest):
             with self.raises(s_exc.BadArg):
                 await nodes[0].delEdge('foo', 'bar')
 
+            n2iden = nodes[1].iden()
+            await nodes[0].addEdge('refs', n2iden)
+            await nodes[0].addEdge('seen', n2iden)
+            await nodes[0].addEdge('foo', n2iden)
+
+            await nodes[0].delEdges((('refs', n2iden), ('seen', n2iden)))
+            self.eq([('foo', n2iden)], [e async for e in nodes[0].iterEdgesN1()])
+
+            runt = (await core.nodes('syn:form=inet:ipv4'))[0]
+            with self.raises(s_exc.IsRuntForm):
+                await runt.delEdges((('refs', n2iden),))
+
     async def test_node_delete(self):
         async with self.getTestCore() as core:
 
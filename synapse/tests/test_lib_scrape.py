@@ -518,6 +518,14 @@ class ScrapeTest(s_t_utils.SynTest):
         with self.raises(s_exc.BadArg):
             s_scrape.genFangRegex({'hehe': 'haha', 'newp': 'bignope'})
 
+        # the longest fang wins regardless of the order it was provided in
+        fangs = {'[.': '.', '[.]': '.', 'hxxp:': 'http:', 'hxxps:': 'https:'}
+        fangre = s_scrape.genFangRegex(fangs)
+        self.eq('(?:\\[\\.(?:\\])?|hxxp(?::|s:))', fangre.pattern)
+        text, offsets = s_scrape.refang_text2('HXXPS://foo[.]bar[.com', re=fangre, fangs=fangs)
+        self.eq('https://foo.bar.com', text)
+        self.eq({0: 1, 11: 3, 15: 2}, offsets)
+
         ndefs = list(s_scrape.scrape('log4j vuln CVE-2021-44228 is pervasive'))
         self.eq(ndefs, (('it:sec:cve', 'CVE-2021-44228'),))
 
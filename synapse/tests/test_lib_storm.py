@@ -3,15 +3,18 @@ import asyncio
 import datetime
 import itertools
 import urllib.parse as u_parse
+import unittest.mock as mock
 
 import synapse.exc as s_exc
 import synapse.common as s_common
 import synapse.telepath as s_telepath
 import synapse.datamodel as s_datamodel
 
+import synapse.lib.ast as s_ast
 import synapse.lib.base as s_base
 import synapse.lib.coro as s_coro
 import synapse.lib.storm as s_storm
+import synapse.lib.parser as s_parser
 import synapse.lib.httpapi as s_httpapi
 import synapse.lib.msgpack as s_msgpack
 import synapse.lib.version as s_version
@@ -88,6 +91,12 @@ class StormTest(s_t_utils.SynTest):
             with self.raises(s_exc.BadSyntax):
                 await core.callStorm('return(({"foo": "bar", "baz": foo}))')
 
+    def test_lib_storm_cmds_parse(self):
+        # ensure the storm bodies of the builtin pure commands are valid
+        for cdef in s_storm.stormcmds:
+            query = s_parser.parseQuery(cdef['storm'])
+            self.isinstance(query, s_ast.Query)
+
     async def test_lib_storm_triplequote(self):
         async with self.getTestCore() as core:
             retn = await core.callStorm("""
@@ -527,6 +536,14 @@ class StormTest(s_t_utils.SynTest):
             ''')
             self.eq((0, 'haha'), await core.callStorm('return($lib.queue.get(bar).get())'))
 
+            # vars which can not be packed are not passed to the background query
+            await core.nodes('''$lib.queue.gen(baz)
+            $g = $lib.queue.get(baz).gets()
+            $v = hoho
+            background { $lib.queue.get(baz).put($v) }
+            ''')
+            self.eq((0, 'hoho'), await core.callStorm('return($lib.queue.get(baz).get())'))
+
             with self.raises(s_exc.StormRuntimeError):
                 await core.nodes('[ ou:org=*] $text = $node.repr() | background $text')
 
@@ -797,6 +814,28 @@ class StormTest(s_t_utils.SynTest):
             self.false(await core.callStorm(f'return($lib.dmon.stop(newp))'))
             self.false(await core.callStorm(f'return($lib.dmon.start(newp))'))
 
+            # a dmon which fails to stop is logged and does not stop the others
+            ddef2 = await core.callStorm('return($lib.dmon.add(${ $lib.time.sleep(10) }, name=otherdmon))')
+            dmon0 = core.stormdmons.getDmon(ddef0['iden'])
+            dmon2 = core.stormdmons.getDmon(ddef2['iden'])
+
+            async def stopfail():
+                raise s_exc.SynErr(mesg='dmon stop failed')
+
+            with mock.patch.object(dmon0, 'stop', stopfail):
+                with self.getAsyncLoggerStream('synapse.lib.storm', 'Error during dmon stop') as stream:
+                    await core.stormdmons.stop()
+                    self.true(await stream.wait(timeout=6))
+
+            stream.seek(0)
+            self.isin(ddef0['iden'], stream.read())
+            self.none(dmon2.task)
+
+            await dmon0.stop()
+            await core.stormdmons.start()
+            self.nn(dmon2.task)
+            await core.callStorm('$lib.dmon.del($iden)', opts={'vars': {'iden': ddef2['iden']}})
+
             self.eq((1, 'lolz'), await core.callStorm('return($lib.queue.gen(hehedmon).get(1))'))
 
             async with core.getLocalProxy() as proxy:
@@ -1378,6 +1417,32 @@ class StormTest(s_t_utils.SynTest):
             msgs = await core.stormlist('test:ro | merge', opts=altview)
             self.stormIsInWarn("Cannot merge read only property with conflicting value", msgs)
 
+            # nodes merged before a permission failure remain merged
+            await core.nodes('[ test:int=1000 test:int=1001 (test:int=1002 +#nope) test:int=1003 ]',
+                             opts={'view': viewiden})
+
+            q = 'test:int=1000 test:int=1001 test:int=1002 test:int=1003 | merge --apply'
+            with self.raises(s_exc.AuthDeny):
+                await core.nodes(q, opts={'view': viewiden, 'user': visi.iden})
+
+            self.len(1, await core.nodes('test:int=1000'))
+            self.len(1, await core.nodes('test:int=1001'))
+            self.len(0, await core.nodes('test:int=1002'))
+            self.len(0, await core.nodes('test:int=1003'))
+            self.len(2, await core.nodes('diff | +test:int', opts={'view': viewiden}))
+
+            # nodes are merged as they are yielded so an early exit stops the merge
+            altview = {'view': viewiden}
+            await core.nodes('for $i in $lib.range(10) { [ test:int=$i +#lim ] }', opts=altview)
+            nodes = await core.nodes('test:int#lim | merge --apply | limit 1', opts=altview)
+            self.len(1, nodes)
+            self.nn(nodes[0].tags.get('lim'))
+            self.len(1, await core.nodes('test:int#lim'))
+
+            nodes = await core.nodes('test:int#lim | merge --apply', opts=altview)
+            self.len(10, nodes)
+            self.len(10, await core.nodes('test:int#lim'))
+
     async def test_storm_merge_opts(self):
 
         async with self.getTestCore() as core:
@@ -2056,6 +2121,11 @@ class StormTest(s_t_utils.SynTest):
             q = '[ inet:fqdn=www.vertex.link ] | tree { inet:fqdn=www.vertex.link }'
             await self.asyncraises(s_exc.StormRuntimeError, core.nodes(q))
 
+            # Deep walks are yielded depth first in pivot order
+            await core.nodes('for $i in $lib.range(100) { [ test:str=$i :hehe=$($i + 1) ] }')
+            nodes = await core.nodes('test:str=0 | tree { :hehe -> test:str }')
+            self.eq([str(i) for i in range(100)], [n.ndef[1] for n in nodes])
+
             # Runtsafety test
             q = '[ inet:fqdn=www.vertex.link ] $q={ :domain -> inet:fqdn } | tree $q'
             await self.asyncraises(s_exc.StormRuntimeError, core.nodes(q))
@@ -2529,6 +2599,18 @@ class StormTest(s_t_utils.SynTest):
             self.len(1, nodes)
             self.eq(0x05060708, nodes[0].ndef[1])
 
+            # runtsafe values are the same for every node so the first node wins
+            first = await core.nodes('inet:ipv4')
+            nodes = await core.nodes('$x = 10 inet:ipv4 | max $x')
+            self.len(1, nodes)
+            self.eq(first[0].ndef, nodes[0].ndef)
+
+            nodes = await core.nodes('$x = 10 inet:ipv4 | min $x')
+            self.len(1, nodes)
+            self.eq(first[0].ndef, nodes[0].ndef)
+
+            self.len(0, await core.nodes('$x = $lib.null inet:ipv4 | max $x'))
+
             # Sad paths where the specify an invalid property name
             with self.raises(s_exc.NoSuchProp):
                 self.len(0, await core.nodes('test:guid | max :newp'))
@@ -2635,6 +2717,14 @@ class StormTest(s_t_utils.SynTest):
             nodes = await core.nodes('$foo="1.2.3.4" | scrape $foo --yield --forms (1)')
             self.len(0, nodes)
 
+            # repeated values across nodes still scrape (and make edges) per node
+            await core.nodes('[ inet:search:query=* inet:search:query=* :text="hi there 7.7.7.7" ]')
+            nodes = await core.nodes('inet:search:query:text="hi there 7.7.7.7" | scrape :text --refs')
+            self.len(2, nodes)
+            nodes = await core.nodes('inet:search:query:text="hi there 7.7.7.7" -(refs)> *')
+            self.len(2, nodes)
+            self.eq(nodes[0].ndef, ('inet:ipv4', 0x07070707))
+
             msgs = await core.stormlist('scrape "https://t.c\\\\"')
             self.stormHasNoWarnErr(msgs)
             msgs = await core.stormlist('[ media:news=* :title="https://t.c\\\\" ] | scrape :title')
@@ -3277,6 +3367,13 @@ class StormTest(s_t_utils.SynTest):
         mesg = 'Extra arguments and flags are not supported with the help flag: hehe newp -h'
         self.eq(('BadArg', {'mesg': mesg}), (pars.exc.errname, pars.exc.errinfo))
 
+        # parsers are reused, so each parse starts with fresh state
+        opts = pars.parse_args(['newp'])
+        self.eq('newp', opts.hehe)
+        self.none(pars.exc)
+        self.false(pars.exited)
+        self.eq([], pars.mesgs)
+
         pars = s_storm.Parser()
         pars.add_argument('--no-foo', default=True, action='store_false')
         opts = pars.parse_args(['--no-foo'])
@@ -3809,6 +3906,19 @@ class StormTest(s_t_utils.SynTest):
             self.len(0, await core.nodes('test:str=refs <(refs)- *'))
             self.len(0, await core.nodes('test:str=* <(seen)- *'))
 
+            # Test deleting more edges than fit in a single batch
+            await core.nodes('[ test:str=batch ] for $i in $lib.range(1100) { [ +(refs)> { [test:int=$i] } ] }')
+            await core.nodes('test:int | [ +(seen)> { test:str=batch } ]')
+
+            self.len(1100, await core.nodes('test:str=batch -(refs)> *'))
+            self.len(1100, await core.nodes('test:str=batch <(seen)- *'))
+
+            await core.nodes('test:str=batch | edges.del refs')
+            self.len(0, await core.nodes('test:str=batch -(refs)> *'))
+
+            await core.nodes('test:str=batch | edges.del seen --n2')
+            self.len(0, await core.nodes('test:str=batch <(seen)- *'))
+
             # Test perms
             visi = await core.auth.addUser('visi')
             await visi.setPasswd('secret')
@@ -1171,6 +1171,29 @@ class StormTypesTest(s_test.SynTest):
             pode[1].pop('path')
             self.eq(pode, apode)
 
+    async def test_storm_lib_pkg_names(self):
+        async with self.getTestCore() as core:
+            self.eq((), await core.callStorm('return($lib.pkg.names(prefix=foo))'))
+
+            await core.addStormPkg({'name': 'foo', 'version': (0, 0, 1)})
+            await core.addStormPkg({'name': 'foosball', 'version': (0, 0, 1)})
+            await core.addStormPkg({'name': 'bar', 'version': (0, 0, 1)})
+
+            names = await core.callStorm('return($lib.pkg.names())')
+            self.isin('foo', names)
+            self.isin('bar', names)
+            self.eq(names, sorted(names))
+            self.eq(names, [pkg['name'] for pkg in await core.callStorm('return($lib.pkg.list())')])
+
+            self.eq(('foo', 'foosball'), await core.callStorm('return($lib.pkg.names(prefix=foo))'))
+            self.eq(('foosball',), await core.callStorm('return($lib.pkg.names(prefix=foos))'))
+            self.eq(('bar',), await core.callStorm('return($lib.pkg.names(prefix=ba))'))
+            self.eq((), await core.callStorm('return($lib.pkg.names(prefix=newp))'))
+
+            # the name list is readonly safe
+            opts = {'readonly': True}
+            self.eq(('foo', 'foosball'), await core.callStorm('return($lib.pkg.names(prefix=foo))', opts=opts))
+
     async def test_storm_lib_dict(self):
         async with self.getTestCore() as core:
             nodes = await core.nodes('$blah = $lib.dict(foo=vertex.link) [ inet:fqdn=$blah.foo ]')
@@ -1274,6 +1297,39 @@ class StormTypesTest(s_test.SynTest):
             q = '$foo="hehe {haha} {newp}" return ( $foo.format(haha=yup, baz=faz) )'
             self.eq('hehe yup {newp}', await core.callStorm(q))
 
+            q = '$foo="{haha:<6}|{haha:>6}|{haha}|{newp:<3}" return ( $foo.format(haha=yup) )'
+            self.eq('yup   |   yup|yup|{newp:<3}', await core.callStorm(q))
+
+            q = 'return ( $lib.str.format("{num:<4}|", num=(10)) )'
+            self.eq('10  |', await core.callStorm(q))
+
+            q = '$foo="{haha:d}" return ( $foo.format(haha=yup) )'
+            await self.asyncraises(s_exc.BadArg, core.callStorm(q))
+
+            # specs on names which are not passed are left alone, even if invalid
+            q = 'return ( $lib.str.format("{haha:d} {newp:zz} {haha}", haha=yup) )'
+            await self.asyncraises(s_exc.BadArg, core.callStorm(q))
+            q = 'return ( $lib.str.format("{newp:d} {newp:zz} {haha}", haha=yup) )'
+            self.eq('{newp:d} {newp:zz} yup', await core.callStorm(q))
+            q = 'return ( $lib.str.format("{haha:<6}|") )'
+            self.eq('{haha:<6}|', await core.callStorm(q))
+
+            msgs = await core.stormlist('$lib.print("{haha:>6}|{haha}", haha=yup)')
+            self.stormIsInPrint('   yup|yup', msgs)
+            msgs = await core.stormlist('$lib.print("{haha:d}", haha=yup)')
+            self.stormIsInErr('Invalid format spec', msgs)
+
+            # substituted values are never re-scanned for names or specs
+            msgs = await core.stormlist('$lib.warn("bad value {valu} for {name}", valu="{name:zz}", name=foo)')
+            self.stormIsInWarn('bad value {name:zz} for foo', msgs)
+            self.len(0, [m for m in msgs if m[0] == 'err'])
+            q = 'return ( $lib.str.format("{a} {b}", a="{b}", b="{a}") )'
+            self.eq('{b} {a}', await core.callStorm(q))
+
+            msgs = await core.stormlist('$lib.print("{name: {name}}", name=visi)')
+            self.stormIsInPrint('{name: visi}', msgs)
+            self.len(0, [m for m in msgs if m[0] == 'err'])
+
             # tuck the regx tests in with str
             self.true(await core.callStorm(r'''return($lib.regex.matches('^foo', foobar))'''))
             self.true(await core.callStorm(r'''return($lib.regex.matches('foo', FOOBAR, $lib.regex.flags.i))'''))